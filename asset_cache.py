@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+
+import pygame
+
+# On-disk cache of baked surfaces (sky, mountain strips, wall tiles, sprites),
+# so later launches copy pixels instead of re-running the drawing code.
+#
+# An entry is keyed by a hash of everything that went into the bake: the
+# baker's parameters, the bytecode of the functions that draw it, and the
+# display's pixel format. Change any of them and the key changes, so the
+# entry is baked again rather than loaded stale.
+#
+# Each entry is one file: a JSON header line describing the surfaces, then
+# their raw pixel rows in the surfaces' own pixel format, so loading is a
+# straight copy into a new Surface.
+
+FORMAT_VERSION = 1
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".mandir_jumper", "assets")
+
+def code_fingerprint(code):
+    # Bytecode, names and constants, recursing into nested functions. Unlike
+    # marshal output this is stable from one process to the next.
+    parts = [code.co_code.hex(), repr(code.co_names)]
+    for const in code.co_consts:
+        parts.append(code_fingerprint(const) if hasattr(const, "co_code") else repr(const))
+    return "|".join(parts)
+
+class AssetCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        # Entry names loaded from disk and baked this launch, for startup reports
+        self.loaded = []
+        self.baked = []
+        self.writers = []
+    
+    def key(self, name, params, functions):
+        display = pygame.display.get_surface()
+        display_format = (display.get_bitsize(), display.get_masks()) if display is not None else None
+        fingerprints = [code_fingerprint(function.__code__) for function in functions]
+        text = repr((FORMAT_VERSION, name, params, fingerprints, display_format))
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+    
+    def path(self, name, key):
+        return os.path.join(self.directory, f"{name}-{key}.surfaces")
+    
+    def get(self, name, params, functions, bake):
+        # The surfaces bake() returns, loaded from disk if nothing in params or
+        # functions has changed since they were last baked
+        key = self.key(name, params, functions)
+        surfaces = self.load(name, key)
+        if surfaces is None:
+            surfaces = bake()
+            self.save(name, key, surfaces)
+        return surfaces
+    
+    def load(self, name, key):
+        # Returns the cached list of surfaces, or None if they must be baked
+        path = self.path(name, key)
+        surfaces = []
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                for entry in header:
+                    surface = pygame.Surface(entry["size"], entry["flags"], entry["bitsize"], entry["masks"])
+                    if surface.get_pitch() != entry["pitch"]:
+                        return None
+                    # Read straight into the surface's pixels
+                    pixels = surface.get_buffer()
+                    length = f.readinto(memoryview(pixels).cast("B"))
+                    del pixels
+                    if length != surface.get_pitch() * surface.get_height():
+                        return None
+                    if entry["colorkey"] is not None:
+                        surface.set_colorkey(entry["colorkey"])
+                    surfaces.append(surface)
+        except (OSError, ValueError, KeyError, TypeError, pygame.error):
+            # Missing, truncated or malformed: bake it again
+            return None
+        self.loaded.append(name)
+        return surfaces
+    
+    def save(self, name, key, surfaces):
+        # Pixels are copied now; the file is written on a background thread so
+        # a cold start doesn't also wait on the disk
+        header = []
+        chunks = []
+        for surface in surfaces:
+            colorkey = surface.get_colorkey()
+            header.append({
+                "size": surface.get_size(),
+                "flags": surface.get_flags() & pygame.SRCALPHA,
+                "bitsize": surface.get_bitsize(),
+                "masks": surface.get_masks(),
+                "pitch": surface.get_pitch(),
+                "colorkey": list(colorkey) if colorkey is not None else None,
+            })
+            chunks.append(surface.get_buffer().raw)
+        self.baked.append(name)
+        writer = threading.Thread(target=self.write, args=(name, key, header, chunks), name="asset-cache")
+        writer.start()
+        self.writers.append(writer)
+    
+    def write(self, name, key, header, chunks):
+        path = self.path(name, key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(json.dumps(header, separators=(",", ":")).encode() + b"\n")
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(path + ".tmp", path)
+            # Drop this asset's entries for older keys
+            for filename in os.listdir(self.directory):
+                if filename.startswith(name + "-") and filename.endswith(".surfaces") and filename != os.path.basename(path):
+                    os.remove(os.path.join(self.directory, filename))
+        except OSError:
+            # The next launch just bakes again
+            pass
+    
+    def close(self):
+        # Waits for entries still being written
+        for writer in self.writers:
+            writer.join()
@@ -0,0 +1,126 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from mandir_jumper import World, Balance, FPS
+
+# Difficulty tuning: plays many seeded bot games for every combination of
+# Balance settings across a process pool and aggregates score distributions,
+# survival times and death causes. Every configuration plays the same seeds,
+# so differences between configurations come from the settings, not luck.
+
+def dodge_bot(world):
+    # Jump to the other wall when an enemy is about to drop onto the player
+    player = world.player
+    if player.jumping:
+        return False
+    left = player.x - 20
+    right = player.x + player.width + 20
+    for enemy in world.enemies:
+        gap = player.y - (enemy.y + enemy.height)
+        if -player.height < gap < 60 and enemy.x < right and enemy.x + enemy.width > left:
+            return True
+    return False
+
+def play_game(job):
+    # One bot game; runs in a worker process
+    config, settings, seed, max_frames = job
+    world = World(seed, balance=Balance(**settings))
+    world.run(max_frames, dodge_bot)
+    return config, world.score, world.frame, world.death_cause or "timeout"
+
+def percentile(values, point):
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * point // 100)]
+
+def summarize(settings, scores, frames, causes):
+    survival = [frame / FPS for frame in frames]
+    return {
+        "settings": settings,
+        "games": len(scores),
+        "score": {
+            "mean": sum(scores) / len(scores),
+            "p10": percentile(scores, 10),
+            "p50": percentile(scores, 50),
+            "p90": percentile(scores, 90),
+            "max": max(scores),
+        },
+        "survival_seconds": {
+            "mean": sum(survival) / len(survival),
+            "p50": percentile(survival, 50),
+        },
+        "death_causes": dict(Counter(causes)),
+    }
+
+def parse_value(text):
+    # "1:3" is a (low, high) range, otherwise an int or float
+    if ":" in text:
+        return tuple(parse_value(part) for part in text.split(":"))
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def parse_sweep(assignments):
+    # ["spawn_rate_min=20,30", "enemy_speed=1:3,2:4"] -> list of settings dicts
+    known = Balance().to_dict()
+    axes = {}
+    for assignment in assignments:
+        name, _, values = assignment.partition("=")
+        if name not in known:
+            raise SystemExit(f"unknown setting {name!r}; choose from {', '.join(known)}")
+        axes[name] = [parse_value(value) for value in values.split(",")]
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+def run_sweep(configs, games, seed, max_frames, jobs=None):
+    jobs_list = [(index, settings, seed + game, max_frames)
+                 for index, settings in enumerate(configs) for game in range(games)]
+    workers = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(jobs_list) // (workers * 8))
+    
+    results = [([], [], []) for _ in configs]
+    with ProcessPoolExecutor(workers) as pool:
+        for config, score, frames, cause in pool.map(play_game, jobs_list, chunksize=chunksize):
+            results[config][0].append(score)
+            results[config][1].append(frames)
+            results[config][2].append(cause)
+    
+    return [summarize(settings, *result) for settings, result in zip(configs, results)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch bot simulation for difficulty tuning")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="sweep a Balance setting over these values (ranges as LOW:HIGH); repeat to sweep several")
+    parser.add_argument("--games", type=int, default=1000, help="games per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="first game seed")
+    parser.add_argument("--max-frames", type=int, default=FPS * 600, help="cut games off after this many frames")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+    
+    configs = parse_sweep(args.set)
+    start = time.perf_counter()
+    summaries = run_sweep(configs, args.games, args.seed, args.max_frames, args.jobs)
+    elapsed = time.perf_counter() - start
+    
+    for summary in summaries:
+        settings = ", ".join(f"{name}={value}" for name, value in summary["settings"].items()) or "defaults"
+        print(f"{settings}: score p50 {summary['score']['p50']} mean {summary['score']['mean']:.1f}, "
+              f"survival {summary['survival_seconds']['mean']:.1f}s, deaths {summary['death_causes']}", file=sys.stderr)
+    print(f"{len(configs) * args.games} games in {elapsed:.1f}s", file=sys.stderr)
+    
+    text = json.dumps({"balance_defaults": Balance().to_dict(), "configs": summaries}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# Render into an offscreen surface unless a real display was asked for, and
+# keep pygame's banner out of the JSON on stdout
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from mandir_jumper import Game, World, SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Deterministic benchmark scenarios. Each scenario is a per-frame script that
+# may adjust the world (to force spawns or keep the player alive) and returns
+# True when the player should jump. Runs are seeded so two runs of the same
+# build see exactly the same frames.
+
+def jump_pattern(world):
+    # Scripted jump cadence shared by the scenarios that play
+    return world.frame % 45 == 0
+
+def idle_climb(world):
+    # No input and no enemies: just the climb, background and HUD
+    world.schedule.enemies.clear()
+    return False
+
+def normal_play(world):
+    return jump_pattern(world)
+
+def powerup_heavy(world):
+    # A power-up every 20 frames on top of the scheduled ones
+    if world.frame % 20 == 0:
+        powerup_type = world.random.choice(["chiyaa", "prayer_wheel"])
+        world.add_powerup(world.random.randint(100, SCREEN_WIDTH - 120), world.camera_y - 100, powerup_type)
+    return jump_pattern(world)
+
+def enemy_population(count):
+    def script(world):
+        # Keep the player alive and the population topped up inside the view
+        world.player.invincible = True
+        world.player.invincible_timer = 180
+        while len(world.enemies) < count:
+            enemy_type = world.random.choice(["crow", "khukuri"])
+            x = world.random.randint(100, SCREEN_WIDTH - 120)
+            y = world.camera_y + world.random.randint(0, SCREEN_HEIGHT)
+            world.add_enemy(x, y, enemy_type, world.random.uniform(1, 3), world.random.choice([-1, 1]),
+                            world.random.uniform(0.5, 1.5))
+        return jump_pattern(world)
+    return script
+
+SCENARIOS = {
+    "idle_climb": idle_climb,
+    "normal_play": normal_play,
+    "powerup_heavy": powerup_heavy,
+    "enemies_10": enemy_population(10),
+    "enemies_100": enemy_population(100),
+    "enemies_1000": enemy_population(1000),
+}
+
+def play(game, script, frames, timings=None):
+    world = game.world
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        if world.game_over:
+            world.step(restart=True)
+        else:
+            world.step(jump=script(world))
+        middle = time.perf_counter_ns()
+        game.draw()
+        end = time.perf_counter_ns()
+        if timings is not None:
+            timings[0].append(middle - start)
+            timings[1].append(end - middle)
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": sum(samples) / len(samples) / 1e6,
+        "p50_ms": samples[len(samples) // 2] / 1e6,
+        "p95_ms": samples[min(len(samples) - 1, len(samples) * 95 // 100)] / 1e6,
+    }
+
+def run_scenario(game, name, frames, seed):
+    script = SCENARIOS[name]
+    
+    # Timing pass
+    random.seed(seed)
+    game.world = World(seed)
+    update_ns, draw_ns = [], []
+    play(game, script, frames, (update_ns, draw_ns))
+    final_score = game.world.highscore
+    
+    # Memory pass over the same seeded frames; tracemalloc would skew timings
+    random.seed(seed)
+    game.world = World(seed)
+    tracemalloc.start()
+    play(game, script, frames)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    total_ms = (sum(update_ns) + sum(draw_ns)) / 1e6
+    return {
+        "frames": frames,
+        "seed": seed,
+        "update": summarize(update_ns),
+        "draw": summarize(draw_ns),
+        "fps": frames / (total_ms / 1000) if total_ms else 0.0,
+        "peak_memory_kb": peak / 1024,
+        "high_score": final_score,
+    }
+
+def compare(results, baseline, threshold):
+    # Returns the (scenario, metric, old, new) entries that got slower than threshold
+    regressions = []
+    for name, result in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        for metric in ("update", "draw"):
+            before, after = old[metric]["mean_ms"], result[metric]["mean_ms"]
+            if before > 0 and (after - before) / before > threshold:
+                regressions.append((name, metric, before, after))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Mandir Jumper benchmarks")
+    parser.add_argument("--frames", type=int, default=1200, help="frames per scenario")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown in mean update/draw time that counts as a regression")
+    args = parser.parse_args()
+    
+    # Full detail, so results don't depend on how fast the machine is
+    game = Game(quality=0)
+    results = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "video_driver": pygame.display.get_driver(),
+        "scenarios": {},
+    }
+    for name in args.scenario or SCENARIOS:
+        results["scenarios"][name] = run_scenario(game, name, args.frames, args.seed)
+        result = results["scenarios"][name]
+        print(f"{name:<14} update {result['update']['mean_ms']:.3f} ms  draw {result['draw']['mean_ms']:.3f} ms  "
+              f"{result['fps']:.0f} fps  peak {result['peak_memory_kb']:.0f} KiB", file=sys.stderr)
+    
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, metric, before, after in regressions:
+            print(f"REGRESSION {name} {metric}: {before:.3f} ms -> {after:.3f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,29 @@
+import os
+import time
+
+# Taken before pygame is imported, for --startup-time
+IMPORT_STARTED = time.perf_counter()
+
+# Importing stays free of side effects: no banner on stdout, where tools print
+# JSON, and no subsystems started. Game starts only the display and fonts.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
 import pygame
 import random
 import math
 import sys
-
-# Initialize Pygame
-pygame.init()
+import argparse
+from collections import OrderedDict, deque
 
 # Constants
 SCREEN_WIDTH = 400
 SCREEN_HEIGHT = 700
 FPS = 60
+# Fixed simulation timestep; rendering may run faster or slower than this
+STEP_SECONDS = 1.0 / FPS
+# Most simulation steps run per rendered frame before falling behind is
+# accepted, so a slow frame can't snowball into ever longer catch-ups
+MAX_CATCH_UP_STEPS = 5
 
 # Colors
 WHITE = (255, 255, 255)
@@ -21,11 +35,29 @@ GREEN = (0, 255, 0)
 GRAY = (128, 128, 128)
 DARK_BROWN = (101, 67, 33)
 ORANGE = (255, 165, 0)
+# Every named color, as part of the key for cached baked surfaces
+PALETTE = (WHITE, BLACK, BROWN, GOLD, RED, GREEN, GRAY, DARK_BROWN, ORANGE)
+
+# Player input events, as fed to World.input and stored in replays
+JUMP = 0
+RESTART = 1
+
+# Sprite atlas keys, shared so looking up a sprite never allocates
+PLAYER_SPRITES = (("player", False), ("player", True))
+KHUKURI_SPRITES = tuple(("khukuri", frame) for frame in range(72))
+SPRITE_KEYS = {name: (name, 0) for name in ["crow", "chiyaa", "prayer_wheel"]}
 
 class Player:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "width", "height", "on_left_wall", "jumping", "jump_progress",
+                 "jump_duration", "jump_height", "climb_speed", "jump_start_x", "jump_start_y",
+                 "jump_target_x", "speed_boost", "speed_boost_timer", "invincible", "invincible_timer")
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        # Position before the last update, for render interpolation
+        self.prev_x = x
+        self.prev_y = y
         self.width = 30
         self.height = 40
         self.on_left_wall = True
@@ -40,8 +72,11 @@ class Player:
         self.speed_boost_timer = 0
         self.invincible = False
         self.invincible_timer = 0
-        
+    
     def update(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Handle power-up timers
         if self.speed_boost:
             self.speed_boost_timer -= 1
@@ -87,22 +122,27 @@ class Player:
             else:
                 self.jump_target_x = 80
     
-    def activate_speed_boost(self):
+    def activate_speed_boost(self, duration=300):
         self.speed_boost = True
-        self.speed_boost_timer = 300
+        self.speed_boost_timer = duration
     
-    def activate_invincibility(self):
+    def activate_invincibility(self, duration=180):
         self.invincible = True
-        self.invincible_timer = 180
+        self.invincible_timer = duration
     
     def get_rect(self):
         return pygame.Rect(self.x, self.y, self.width, self.height)
     
+    def flashing(self):
+        # Flash effect when invincible
+        return self.invincible and self.invincible_timer % 10 < 5
+    
+    def sprite_key(self):
+        return PLAYER_SPRITES[self.flashing()]
+    
     def draw(self, screen):
         center_x = self.x + self.width // 2
-        
-        # Flash effect when invincible
-        flash = self.invincible and self.invincible_timer % 10 < 5
+        flash = self.flashing()
         
         # Draw head
         head_color = WHITE if flash else (255, 220, 177)
@@ -140,14 +180,25 @@ class Player:
         ])
 
 class Enemy:
-    def __init__(self, x, y, enemy_type):
+    # Slots keep pooled enemies small; cell and slot are SpatialHash/EntityPool bookkeeping
+    __slots__ = ("x", "y", "prev_x", "prev_y", "type", "speed", "direction", "rotation", "fall_speed",
+                 "width", "height", "cell", "slot")
+    
+    def __init__(self, x, y, enemy_type, rng=random, speed_range=(1, 3), fall_speed_range=(0.5, 1.5)):
+        self.reset(x, y, enemy_type, rng.uniform(*speed_range), rng.choice([-1, 1]), rng.uniform(*fall_speed_range))
+    
+    def reset(self, x, y, enemy_type, speed, direction, fall_speed):
+        # Re-initialize in place so EntityPool can recycle enemies
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         self.type = enemy_type
-        self.speed = random.uniform(1, 3)
-        self.direction = random.choice([-1, 1])
+        self.speed = speed
+        self.direction = direction
         self.rotation = 0
-        self.fall_speed = random.uniform(0.5, 1.5)
+        self.fall_speed = fall_speed
+        self.cell = None
         
         if enemy_type == "crow":
             self.width = 25
@@ -157,6 +208,9 @@ class Enemy:
             self.height = 30
     
     def update(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Horizontal movement
         self.x += self.speed * self.direction
         
@@ -174,6 +228,12 @@ class Enemy:
     def get_rect(self):
         return pygame.Rect(self.x, self.y, self.width, self.height)
     
+    def sprite_key(self):
+        if self.type == "khukuri":
+            # Rotation moves in 5 degree steps, so there are only 72 distinct frames
+            return KHUKURI_SPRITES[int(self.rotation) // 5 % 72]
+        return SPRITE_KEYS[self.type]
+    
     def draw(self, screen):
         center_x = self.x + self.width // 2
         center_y = self.y + self.height // 2
@@ -192,7 +252,7 @@ class Enemy:
             # Draw eye
             pygame.draw.circle(screen, WHITE, (center_x + 10, center_y - 5), 2)
             pygame.draw.circle(screen, BLACK, (center_x + 10, center_y - 5), 1)
-            
+        
         else:  # khukuri
             # Draw spinning knife
             angle_rad = math.radians(self.rotation)
@@ -221,22 +281,34 @@ class Enemy:
             pygame.draw.line(screen, DARK_BROWN, (center_x, center_y), (handle_tip_x, handle_tip_y), 4)
 
 class PowerUp:
+    __slots__ = ("x", "y", "type", "width", "height", "bob_offset", "cell", "slot")
+    
     def __init__(self, x, y, powerup_type):
+        self.reset(x, y, powerup_type)
+    
+    def reset(self, x, y, powerup_type):
         self.x = x
         self.y = y
         self.type = powerup_type
         self.width = 20
         self.height = 20
         self.bob_offset = 0
+        self.cell = None
     
     def update(self):
         self.bob_offset += 0.2
     
+    def bobbed_y(self):
+        return self.y + math.sin(self.bob_offset) * 3
+    
     def get_rect(self):
-        return pygame.Rect(self.x, self.y + math.sin(self.bob_offset) * 3, self.width, self.height)
+        return pygame.Rect(self.x, self.bobbed_y(), self.width, self.height)
+    
+    def sprite_key(self):
+        return SPRITE_KEYS[self.type]
     
     def draw(self, screen):
-        y_pos = self.y + math.sin(self.bob_offset) * 3
+        y_pos = self.bobbed_y()
         center_x = self.x + self.width // 2
         center_y = y_pos + self.height // 2
         
@@ -256,76 +328,524 @@ class PowerUp:
             pygame.draw.circle(screen, RED, (int(center_x), int(center_y)), self.width//3)
             pygame.draw.circle(screen, WHITE, (int(center_x), int(center_y)), 2)
 
-class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Mandir Jumper")
-        self.clock = pygame.time.Clock()
+class ParallaxBackground:
+    # Width of the pre-rendered mountain strips. Every sine frequency is snapped
+    # to a whole number of periods over this width so the strips wrap seamlessly.
+    STRIP_WIDTH = 2400
+    
+    # Mountain layers from furthest to closest:
+    # (color, vertex spacing, parallax factor, base height, [(amplitude, frequency), ...])
+    LAYERS = [
+        # Layer 1: Distant peaks (lightest, furthest)
+        ((190, 200, 220), 12, 0.3, 200, [(40, 0.008), (60, 0.03), (20, 0.1)]),
+        # Layer 2: Middle range (medium tone)
+        ((150, 160, 180), 10, 0.5, 160, [(50, 0.012), (45, 0.025), (15, 0.08)]),
+        # Layer 3: Near mountains (darkest, closest)
+        ((110, 120, 140), 8, 0.7, 120, [(35, 0.015), (40, 0.04), (12, 0.12)]),
+    ]
+    
+    def __init__(self, cache=None):
+        # Only the area between the walls is ever visible
+        self.view_x = 80
+        self.view_width = SCREEN_WIDTH - 160
+        if cache is not None:
+            params = (self.LAYERS, self.STRIP_WIDTH, self.view_x, self.view_width, SCREEN_HEIGHT)
+            functions = (self.sky_color, self.bake_sky, self.bake_layer, self.wrap_frequency, self.prepare)
+            surfaces = cache.get("background", params, functions, self.bake)
+        else:
+            surfaces = self.bake()
+        self.sky = surfaces[0]
+        self.layers = [(strip, layer[2]) for strip, layer in zip(surfaces[1:], self.LAYERS)]
         
-        # Game state
-        self.player = Player(80, SCREEN_HEIGHT - 100)
-        self.enemies = []
-        self.powerups = []
-        self.score = 0
-        self.highscore = 0
-        self.camera_y = 0
-        self.spawn_timer = 0
-        self.powerup_spawn_timer = 0
-        self.game_start_timer = 0
-        self.game_over = False
+        # Screen band covered by the mountains, and the scroll it was last drawn at
+        band_height = max(strip.get_height() for strip, _ in self.layers)
+        self.band = pygame.Rect(self.view_x, SCREEN_HEIGHT - band_height, self.view_width, band_height)
+        self.last_scrolls = None
         
-        # UI Font
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        # Single-color stand-in for the gradient at the lowest quality level
+        self.sky_rect = pygame.Rect(self.view_x, 0, self.view_width, SCREEN_HEIGHT)
+        self.flat_sky_color = self.sky_color(SCREEN_HEIGHT // 2)
     
-    def spawn_enemy(self):
-        enemy_type = random.choice(["crow", "khukuri"])
-        x = random.randint(100, SCREEN_WIDTH - 120)
-        y = self.camera_y - random.randint(100, 300)
-        self.enemies.append(Enemy(x, y, enemy_type))
+    @staticmethod
+    def sky_color(y):
+        # Sky gradient (dawn/dusk colors for Himalayan atmosphere)
+        progress = y / SCREEN_HEIGHT
+        if progress < 0.3:  # Upper sky - deep blue
+            r = int(70 + progress * 100)
+            g = int(130 + progress * 80)
+            b = int(200 + progress * 55)
+        elif progress < 0.7:  # Middle sky - lighter blue
+            r = int(120 + (progress - 0.3) * 150)
+            g = int(170 + (progress - 0.3) * 100)
+            b = int(220 + (progress - 0.3) * 35)
+        else:  # Lower sky - warm horizon
+            r = int(200 + (progress - 0.7) * 55)
+            g = int(210 + (progress - 0.7) * 45)
+            b = int(240 + (progress - 0.7) * 15)
+        return (min(255, r), min(255, g), min(255, b))
     
-    def spawn_powerup(self):
-        powerup_type = random.choice(["chiyaa", "prayer_wheel"])
-        x = random.randint(100, SCREEN_WIDTH - 120)
-        y = self.camera_y - random.randint(50, 200)
-        self.powerups.append(PowerUp(x, y, powerup_type))
+    def bake(self):
+        # The sky, then one strip per mountain layer
+        return [self.bake_sky()] + [self.bake_layer(*layer) for layer in self.LAYERS]
     
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    if not self.game_over:
-                        self.player.jump()
-                elif event.key == pygame.K_r and self.game_over:
-                    self.restart_game()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if not self.game_over:
-                    self.player.jump()
-                elif self.game_over:
-                    self.restart_game()
-        return True
+    def bake_sky(self):
+        sky = pygame.Surface((self.view_width, SCREEN_HEIGHT))
+        for y in range(SCREEN_HEIGHT):
+            pygame.draw.line(sky, self.sky_color(y), (0, y), (self.view_width, y))
+        return self.prepare(sky)
+    
+    def bake_layer(self, color, spacing, parallax, base_height, waves):
+        # Snap frequencies so the strip tiles every STRIP_WIDTH pixels
+        waves = [(amplitude, self.wrap_frequency(frequency)) for amplitude, frequency in waves]
+        strip_height = int(base_height + sum(amplitude for amplitude, _ in waves)) + 1
+        
+        # Extra view_width on the right lets a single blit cover the view at any scroll
+        strip_width = self.STRIP_WIDTH + self.view_width
+        strip = pygame.Surface((strip_width, strip_height))
+        key = (255, 0, 255)
+        strip.fill(key)
+        strip.set_colorkey(key)
+        
+        points = []
+        for x in range(0, strip_width + spacing, spacing):
+            height = base_height + sum(amplitude * math.sin(x * frequency) for amplitude, frequency in waves)
+            points.append((x, strip_height - height))
+        points.extend([(strip_width, strip_height), (0, strip_height)])
+        pygame.draw.polygon(strip, color, points)
+        return self.prepare(strip)
+    
+    def wrap_frequency(self, frequency):
+        periods = max(1, round(frequency * self.STRIP_WIDTH / (2 * math.pi)))
+        return 2 * math.pi * periods / self.STRIP_WIDTH
+    
+    @staticmethod
+    def prepare(surface):
+        # Match the display pixel format so per-frame blits are straight copies
+        if pygame.display.get_surface() is not None:
+            return surface.convert()
+        return surface
     
-    def restart_game(self):
+    def draw(self, screen, camera_offset, layers=None, flat_sky=False):
+        # Draws the nearest `layers` mountain layers (all by default). Returns
+        # the mountain band if anything in it changed since the last call.
+        if flat_sky:
+            screen.fill(self.flat_sky_color, self.sky_rect)
+        else:
+            screen.blit(self.sky, (self.view_x, 0))
+        scrolls = []
+        for strip, parallax in self.layers[-(layers or len(self.layers)):]:
+            scroll = int(self.view_x + camera_offset * parallax) % self.STRIP_WIDTH
+            area = pygame.Rect(scroll, 0, self.view_width, strip.get_height())
+            screen.blit(strip, (self.view_x, SCREEN_HEIGHT - strip.get_height()), area)
+            scrolls.append(scroll)
+        
+        if scrolls == self.last_scrolls:
+            return None
+        self.last_scrolls = scrolls
+        return self.band
+
+class WallTiles:
+    # Temple walls as pre-rendered strips locked to the world, so they scroll
+    # with the climb. Every theme is baked once at startup; a frame costs one
+    # or two blits per wall however detailed the art is.
+    WIDTH = 80
+    # Each theme's pattern repeats every PERIOD pixels
+    PERIOD = 400
+    # Climb covered by one theme before the next takes over
+    THEME_HEIGHT = SCREEN_HEIGHT * 3
+    THEMES = ("temple", "carved", "bells", "doorway")
+    
+    def __init__(self, cache=None):
+        if cache is not None:
+            params = (self.WIDTH, self.PERIOD, self.THEMES, SCREEN_HEIGHT, PALETTE)
+            functions = (self.bake, self.decorate, ParallaxBackground.prepare)
+            lefts = cache.get("walls", params, functions, lambda: [self.bake(theme) for theme in self.THEMES])
+        else:
+            lefts = [self.bake(theme) for theme in self.THEMES]
+        # theme -> (left strip, right strip); the right wall is the left mirrored
+        self.strips = {}
+        for theme, left in zip(self.THEMES, lefts):
+            self.strips[theme] = (left, pygame.transform.flip(left, True, False))
+        self.rects = (pygame.Rect(0, 0, self.WIDTH, SCREEN_HEIGHT),
+                      pygame.Rect(SCREEN_WIDTH - self.WIDTH, 0, self.WIDTH, SCREEN_HEIGHT))
+        self.last_top = None
+    
+    def theme_index(self, y):
+        # Theme band at world y; band 0 holds the starting screen
+        return (SCREEN_HEIGHT - y) // self.THEME_HEIGHT
+    
+    def bake(self, theme):
+        tile = pygame.Surface((self.WIDTH, self.PERIOD))
+        tile.fill(DARK_BROWN)
+        self.decorate(tile, theme)
+        
+        # Extra SCREEN_HEIGHT at the bottom lets a single blit cover the view at any scroll
+        strip = pygame.Surface((self.WIDTH, self.PERIOD + SCREEN_HEIGHT))
+        for y in range(0, strip.get_height(), self.PERIOD):
+            strip.blit(tile, (0, y))
+        return ParallaxBackground.prepare(strip)
+    
+    def decorate(self, tile, theme):
+        # Stone courses, as on the original walls
+        for y in range(0, self.PERIOD, 50):
+            pygame.draw.rect(tile, BROWN, (10, y, 60, 10))
+        
+        if theme == "carved":
+            # Lotus diamonds carved between the courses
+            for y in range(10, self.PERIOD, 50):
+                center = y + 20
+                pygame.draw.polygon(tile, BROWN, [(40, center - 12), (52, center), (40, center + 12), (28, center)], 2)
+                pygame.draw.circle(tile, BROWN, (40, center), 3)
+        elif theme == "bells":
+            # A bell on a chain every 200 pixels
+            for y in range(0, self.PERIOD, 200):
+                pygame.draw.line(tile, GRAY, (40, y + 10), (40, y + 24), 2)
+                pygame.draw.polygon(tile, GOLD, [(33, y + 38), (35, y + 26), (45, y + 26), (47, y + 38)])
+                pygame.draw.circle(tile, GOLD, (40, y + 26), 5)
+                pygame.draw.circle(tile, DARK_BROWN, (40, y + 39), 2)
+        elif theme == "doorway":
+            # An arched niche with an oil lamp, once per period
+            niche = (45, 25, 10)
+            pygame.draw.rect(tile, BROWN, (14, 96, 52, 164))
+            pygame.draw.rect(tile, niche, (20, 130, 40, 124))
+            pygame.draw.circle(tile, niche, (40, 130), 20)
+            pygame.draw.ellipse(tile, ORANGE, (34, 224, 12, 8))
+            pygame.draw.circle(tile, GOLD, (40, 219), 3)
+    
+    def draw(self, screen, camera_y):
+        # Returns the wall rects if the walls scrolled since the last call
+        top = int(camera_y)
+        band = self.theme_index(top)
+        # First screen row that belongs to the next band down, if any is visible
+        split = SCREEN_HEIGHT - band * self.THEME_HEIGHT - top + 1
+        if split >= SCREEN_HEIGHT:
+            self.blit_rows(screen, band, top, 0, SCREEN_HEIGHT)
+        else:
+            self.blit_rows(screen, band, top, 0, split)
+            self.blit_rows(screen, band - 1, top, split, SCREEN_HEIGHT)
+        
+        if top == self.last_top:
+            return ()
+        self.last_top = top
+        return self.rects
+    
+    def blit_rows(self, screen, band, top, start, end):
+        # Screen rows [start, end) of both walls from the given theme band
+        left, right = self.strips[self.THEMES[band % len(self.THEMES)]]
+        area = pygame.Rect(0, (top + start) % self.PERIOD, self.WIDTH, end - start)
+        screen.blit(left, (0, start), area)
+        screen.blit(right, (SCREEN_WIDTH - self.WIDTH, start), area)
+
+class Balance:
+    # Difficulty knobs read by World; the defaults are the shipped game
+    def __init__(self, spawn_rate_start=90, spawn_rate_min=30, spawn_rate_score_step=50,
+                 powerup_interval=600, speed_boost_duration=300, invincibility_duration=180,
+                 enemy_speed=(1, 3), enemy_fall_speed=(0.5, 1.5), jump_buffer_frames=6):
+        # Frames between enemy spawns: max(min, start - score // step)
+        self.spawn_rate_start = spawn_rate_start
+        self.spawn_rate_min = spawn_rate_min
+        self.spawn_rate_score_step = spawn_rate_score_step
+        # Frames between power-up spawns, and how long each power-up lasts
+        self.powerup_interval = powerup_interval
+        self.speed_boost_duration = speed_boost_duration
+        self.invincibility_duration = invincibility_duration
+        # (low, high) ranges enemies draw their speeds from
+        self.enemy_speed = tuple(enemy_speed)
+        self.enemy_fall_speed = tuple(enemy_fall_speed)
+        # A jump pressed this many frames or fewer before landing fires on landing
+        self.jump_buffer_frames = jump_buffer_frames
+    
+    def to_dict(self):
+        return dict(vars(self))
+
+class SpawnSchedule:
+    # Lays each game out in CHUNK_FRAMES slices of play, generated just ahead
+    # of the game clock (World.game_start_timer). A chunk's spawns depend only
+    # on (seed, chunk index, balance), so chunks can be generated in any order
+    # or ahead of time and a seed always yields the same game. Spawns wait in
+    # queues ordered by the frame that releases them and are dropped once
+    # released. The clock runs whether or not the player climbs, so jumping
+    # on the spot doesn't hold spawns back.
+    #
+    # Enemy entries are (frame, x, rise, type, speed, direction, fall_speed)
+    # and power-up entries (frame, x, rise, type); each spawns rise pixels
+    # above the camera.
+    CHUNK_FRAMES = 600
+    # Opening frames with no enemies
+    GRACE_FRAMES = 120
+    
+    def __init__(self, seed, balance, spawn_rate=None):
+        self.seed = seed
+        self.balance = balance
+        # Frames between enemy spawns, overriding the score-based curve
+        self.fixed_spawn_rate = spawn_rate
+        self.enemies = deque()
+        self.powerups = deque()
+        self.next_chunk = 0
+        # Frame where the generated chunks end
+        self.generated_to = 0
+    
+    def enemy_interval(self, frame):
+        # The spawn-rate curve at the score a player has by this frame
+        if self.fixed_spawn_rate is not None:
+            return self.fixed_spawn_rate
+        balance = self.balance
+        score = max(0, frame - 60) // 6
+        return max(balance.spawn_rate_min, balance.spawn_rate_start - score // balance.spawn_rate_score_step)
+    
+    def generate_chunk(self, index):
+        # Returns the chunk's (enemy entries, power-up entries)
+        rng = random.Random(f"{self.seed}:{index}")
+        balance = self.balance
+        first = index * self.CHUNK_FRAMES
+        end = first + self.CHUNK_FRAMES
+        
+        enemies = []
+        start = max(first, self.GRACE_FRAMES)
+        frame = start + rng.randint(1, self.enemy_interval(start))
+        while frame < end:
+            enemies.append((frame, rng.randint(100, SCREEN_WIDTH - 120), rng.randint(100, 300),
+                            rng.choice(["crow", "khukuri"]), rng.uniform(*balance.enemy_speed),
+                            rng.choice([-1, 1]), rng.uniform(*balance.enemy_fall_speed)))
+            frame += self.enemy_interval(frame)
+        
+        powerups = []
+        frame = first + rng.randint(1, balance.powerup_interval)
+        while frame < end:
+            powerups.append((frame, rng.randint(100, SCREEN_WIDTH - 120), rng.randint(50, 200),
+                             rng.choice(["chiyaa", "prayer_wheel"])))
+            frame += balance.powerup_interval
+        return enemies, powerups
+    
+    def advance(self, frame):
+        # Keep the schedule laid out a full chunk beyond the clock
+        while frame >= self.generated_to - self.CHUNK_FRAMES:
+            enemies, powerups = self.generate_chunk(self.next_chunk)
+            self.enemies.extend(enemies)
+            self.powerups.extend(powerups)
+            self.next_chunk += 1
+            self.generated_to += self.CHUNK_FRAMES
+    
+    def wake_frame(self):
+        # First frame at which advance or a queued spawn has work to do
+        wake = self.generated_to - self.CHUNK_FRAMES
+        if self.enemies:
+            wake = min(wake, self.enemies[0][0])
+        if self.powerups:
+            wake = min(wake, self.powerups[0][0])
+        return wake
+
+class EntityPool:
+    # Recycles entity objects instead of allocating one per spawn. live is the
+    # list of active entities; each knows its index there (slot), so releasing
+    # one is a swap with the last entry instead of list.remove. Entities come
+    # out of acquire() un-initialized and must be reset() by the caller.
+    def __init__(self, cls, capacity):
+        self.cls = cls
+        self.live = []
+        self.free = [cls.__new__(cls) for _ in range(capacity)]
+    
+    def __len__(self):
+        return len(self.live)
+    
+    def acquire(self):
+        # Grows past capacity rather than refusing a spawn
+        entity = self.free.pop() if self.free else self.cls.__new__(self.cls)
+        entity.slot = len(self.live)
+        self.live.append(entity)
+        return entity
+    
+    def release(self, entity):
+        live = self.live
+        last = live.pop()
+        if last is not entity:
+            live[entity.slot] = last
+            last.slot = entity.slot
+        self.free.append(entity)
+    
+    def clear(self):
+        self.free.extend(self.live)
+        self.live.clear()
+
+class SpatialHash:
+    # Broadphase for player-vs-world collisions. Entities are bucketed by rows
+    # of world y and re-filed only when they cross a row boundary, so a query
+    # near the player touches a couple of buckets however many entities exist.
+    def __init__(self, cell_height=64):
+        self.cell_height = cell_height
+        # row -> {entity: None}; dicts keep insertion order so queries are deterministic
+        self.rows = {}
+    
+    def insert(self, entity):
+        row = int(entity.y // self.cell_height)
+        entity.cell = row
+        bucket = self.rows.get(row)
+        if bucket is None:
+            bucket = self.rows[row] = {}
+        bucket[entity] = None
+    
+    def remove(self, entity):
+        bucket = self.rows[entity.cell]
+        del bucket[entity]
+        if not bucket:
+            del self.rows[entity.cell]
+    
+    def move(self, entity):
+        if int(entity.y // self.cell_height) != entity.cell:
+            self.remove(entity)
+            self.insert(entity)
+    
+    def near(self, top, bottom):
+        # Entities whose y lies in rows overlapping [top, bottom]
+        for row in range(int(top // self.cell_height), int(bottom // self.cell_height) + 1):
+            bucket = self.rows.get(row)
+            if bucket:
+                yield from bucket
+    
+    def clear(self):
+        self.rows.clear()
+
+class World:
+    # Display-free simulation core: everything Game.update used to do, driven by
+    # explicit inputs so it can step as fast as the CPU allows (soak tests, bots)
+    
+    # Broadphase query margins (above, below the player's rect): how far an
+    # entity's y can be from the player and still touch it, allowing for the
+    # tallest hitbox, the power-up bob and rect truncation
+    ENEMY_REACH = (31, 1)
+    POWERUP_REACH = (24, 4)
+    
+    # Frames between enemy spawns, overriding the score-based curve (stress runs)
+    fixed_spawn_rate = None
+    
+    def __init__(self, seed=None, record=False, balance=None):
+        # Private RNG so a seeded run is reproducible regardless of other callers
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.balance = balance if balance is not None else Balance()
+        self.highscore = 0
+        self.frame = 0
+        self.deaths = 0
+        # (frame, event) for every input, in order, when recording for replays
+        self.inputs = [] if record else None
+        
+        # Recycled entities; self.enemies and self.powerups are the pools' live lists
+        self.enemy_pool = EntityPool(Enemy, 64)
+        self.powerup_pool = EntityPool(PowerUp, 8)
+        
+        # Collision broadphase, plus rects reused for every narrow-phase test
+        self.enemy_grid = SpatialHash()
+        self.powerup_grid = SpatialHash()
+        self.player_rect = pygame.Rect(0, 0, 0, 0)
+        self.entity_rect = pygame.Rect(0, 0, 0, 0)
+        self.restart()
+    
+    def restart(self):
         self.player = Player(80, SCREEN_HEIGHT - 100)
-        self.enemies = []
-        self.powerups = []
+        self.enemy_pool.clear()
+        self.powerup_pool.clear()
+        self.enemies = self.enemy_pool.live
+        self.powerups = self.powerup_pool.live
+        self.enemy_grid.clear()
+        self.powerup_grid.clear()
         self.score = 0
         self.camera_y = 0
-        self.spawn_timer = 0
-        self.powerup_spawn_timer = 0
+        self.prev_camera_y = 0
         self.game_start_timer = 0
+        # Each game gets its own layout, drawn from the world seed
+        self.schedule = SpawnSchedule(self.random.getrandbits(32), self.balance, self.fixed_spawn_rate)
         self.game_over = False
+        # Type of the enemy that ended the last game
+        self.death_cause = None
+        self.powerups_collected = 0
+        # Frames a jump pressed mid-air stays queued for, and whether the last
+        # update took off on a buffered jump
+        self.jump_buffer = 0
+        self.buffered_jump_started = False
+    
+    def spawn_enemy(self, entry):
+        # entry: a SpawnSchedule enemy entry that just came due
+        _, x, rise, enemy_type, speed, direction, fall_speed = entry
+        self.add_enemy(x, self.camera_y - rise, enemy_type, speed, direction, fall_speed)
+    
+    def spawn_powerup(self, entry):
+        _, x, rise, powerup_type = entry
+        self.add_powerup(x, self.camera_y - rise, powerup_type)
+    
+    def add_enemy(self, x, y, enemy_type, speed, direction, fall_speed):
+        enemy = self.enemy_pool.acquire()
+        enemy.reset(x, y, enemy_type, speed, direction, fall_speed)
+        self.enemy_grid.insert(enemy)
+        return enemy
+    
+    def add_powerup(self, x, y, powerup_type):
+        powerup = self.powerup_pool.acquire()
+        powerup.reset(x, y, powerup_type)
+        self.powerup_grid.insert(powerup)
+        return powerup
+    
+    def jump(self):
+        # Returns True if the jump started right away; a press mid-air is buffered
+        if self.game_over:
+            return False
+        if self.player.jumping:
+            self.jump_buffer = self.balance.jump_buffer_frames
+            return False
+        self.player.jump()
+        return True
+    
+    def input(self, event):
+        # Single entry point for player input, applied before the next update.
+        # Returns True when a jump started on this input.
+        if self.inputs is not None:
+            self.inputs.append((self.frame, event))
+        if event == RESTART:
+            if self.game_over:
+                self.restart()
+            return False
+        return self.jump()
+    
+    def step(self, jump=False, restart=False):
+        # One frame of scripted input followed by one simulation tick
+        if restart:
+            self.input(RESTART)
+        if jump:
+            self.input(JUMP)
+        self.update()
+    
+    def run(self, frames, script=None, stop_on_game_over=True):
+        # script(world) -> True to jump this frame; None means never jump.
+        # Without stop_on_game_over the world restarts itself after each death.
+        for _ in range(frames):
+            if self.game_over:
+                if stop_on_game_over:
+                    break
+                self.step(restart=True)
+            else:
+                self.step(jump=script(self) if script is not None else False)
+        return self
     
     def update(self):
+        self.frame += 1
+        self.buffered_jump_started = False
         if self.game_over:
             return
         
         self.game_start_timer += 1
+        self.prev_camera_y = self.camera_y
         
         # Update player
         self.player.update()
+        if self.jump_buffer:
+            if self.player.jumping:
+                self.jump_buffer -= 1
+            else:
+                # Landed with a jump buffered: take off again straight away
+                self.jump_buffer = 0
+                self.player.jump()
+                self.buffered_jump_started = True
         
         # Update camera
         self.camera_y = self.player.y - SCREEN_HEIGHT + 200
@@ -338,121 +858,513 @@ class Game:
                 if self.score > self.highscore:
                     self.highscore = self.score
         
-        # Spawn enemies
-        if self.game_start_timer > 120:
-            self.spawn_timer += 1
-            spawn_rate = max(30, 90 - self.score // 50)
-            
-            if self.spawn_timer > spawn_rate:
-                self.spawn_enemy()
-                self.spawn_timer = 0
-        
-        # Spawn power-ups
-        self.powerup_spawn_timer += 1
-        if self.powerup_spawn_timer > 600:
-            self.spawn_powerup()
-            self.powerup_spawn_timer = 0
-        
-        # Update enemies
-        for enemy in self.enemies[:]:
+        # Release the spawns that are due
+        schedule = self.schedule
+        frame = self.game_start_timer
+        schedule.advance(frame)
+        while schedule.enemies and schedule.enemies[0][0] <= frame:
+            self.spawn_enemy(schedule.enemies.popleft())
+        while schedule.powerups and schedule.powerups[0][0] <= frame:
+            self.spawn_powerup(schedule.powerups.popleft())
+        
+        self.update_entities()
+        self.check_collisions()
+    
+    def update_entities(self):
+        cull_y = self.camera_y + SCREEN_HEIGHT + 100
+        
+        # Update enemies, re-filing the ones that fell into a new grid row.
+        # Walking backwards means a released enemy's slot is refilled by one
+        # that has already been updated.
+        grid = self.enemy_grid
+        cell_height = grid.cell_height
+        enemies = self.enemies
+        for i in range(len(enemies) - 1, -1, -1):
+            enemy = enemies[i]
             enemy.update()
-            if enemy.y > self.camera_y + SCREEN_HEIGHT + 100:
-                self.enemies.remove(enemy)
+            if enemy.y > cull_y:
+                grid.remove(enemy)
+                self.enemy_pool.release(enemy)
+            elif enemy.y // cell_height != enemy.cell:
+                grid.move(enemy)
         
-        # Update power-ups
-        for powerup in self.powerups[:]:
+        # Update power-ups (they only bob, so they never change rows)
+        powerups = self.powerups
+        for i in range(len(powerups) - 1, -1, -1):
+            powerup = powerups[i]
             powerup.update()
-            if powerup.y > self.camera_y + SCREEN_HEIGHT + 100:
-                self.powerups.remove(powerup)
-        
-        # Check collisions with enemies
-        if not self.player.invincible:
-            player_rect = self.player.get_rect()
-            for enemy in self.enemies:
-                if player_rect.colliderect(enemy.get_rect()):
+            if powerup.y > cull_y:
+                self.powerup_grid.remove(powerup)
+                self.powerup_pool.release(powerup)
+    
+    def check_collisions(self):
+        player = self.player
+        player_rect = self.player_rect
+        player_rect.update(player.x, player.y, player.width, player.height)
+        entity_rect = self.entity_rect
+        
+        # Check collisions with enemies near the player
+        if not player.invincible:
+            above, below = self.ENEMY_REACH
+            for enemy in self.enemy_grid.near(player_rect.top - above, player_rect.bottom + below):
+                entity_rect.update(enemy.x, enemy.y, enemy.width, enemy.height)
+                if player_rect.colliderect(entity_rect):
                     self.game_over = True
+                    self.death_cause = enemy.type
+                    self.deaths += 1
                     return
         
-        # Check collisions with power-ups
-        player_rect = self.player.get_rect()
-        for powerup in self.powerups[:]:
-            if player_rect.colliderect(powerup.get_rect()):
-                if powerup.type == "chiyaa":
-                    self.player.activate_speed_boost()
-                else:
-                    self.player.activate_invincibility()
-                self.powerups.remove(powerup)
-    
-    def draw_background(self):
-        # Sky gradient (dawn/dusk colors for Himalayan atmosphere)
-        for y in range(SCREEN_HEIGHT):
-            # Create a more dramatic sky gradient
-            progress = y / SCREEN_HEIGHT
-            if progress < 0.3:  # Upper sky - deep blue
-                r = int(70 + progress * 100)
-                g = int(130 + progress * 80)
-                b = int(200 + progress * 55)
-            elif progress < 0.7:  # Middle sky - lighter blue
-                r = int(120 + (progress - 0.3) * 150)
-                g = int(170 + (progress - 0.3) * 100)
-                b = int(220 + (progress - 0.3) * 35)
-            else:  # Lower sky - warm horizon
-                r = int(200 + (progress - 0.7) * 55)
-                g = int(210 + (progress - 0.7) * 45)
-                b = int(240 + (progress - 0.7) * 15)
-            
-            sky_color = (min(255, r), min(255, g), min(255, b))
-            pygame.draw.line(self.screen, sky_color, (80, y), (SCREEN_WIDTH - 80, y))
+        # Check collisions with power-ups near the player
+        above, below = self.POWERUP_REACH
+        collected = []
+        for powerup in self.powerup_grid.near(player_rect.top - above, player_rect.bottom + below):
+            entity_rect.update(powerup.x, powerup.bobbed_y(), powerup.width, powerup.height)
+            if player_rect.colliderect(entity_rect):
+                collected.append(powerup)
         
-        # Himalayan mountain range with multiple layers
-        camera_offset = self.camera_y * 0.05  # Slower parallax for distant mountains
+        for powerup in collected:
+            if powerup.type == "chiyaa":
+                player.activate_speed_boost(self.balance.speed_boost_duration)
+            else:
+                player.activate_invincibility(self.balance.invincibility_duration)
+            self.powerups_collected += 1
+            self.powerup_grid.remove(powerup)
+            self.powerup_pool.release(powerup)
+
+class SpriteAtlas:
+    # Margin around each sprite for parts drawn outside the hitbox (hair, weapon)
+    PADDING = 12
+    
+    def __init__(self, cache=None):
+        # sprite key -> pre-rendered surface; entities are blitted from here
+        # instead of being rebuilt from draw primitives every frame
+        keys = [key for key, _ in self.templates()]
+        if cache is not None:
+            params = (self.PADDING, keys, PALETTE)
+            functions = (self.templates, self.bake, Player.__init__, Player.activate_invincibility, Player.flashing,
+                         Player.draw, Enemy.__init__, Enemy.reset, Enemy.draw, PowerUp.__init__, PowerUp.reset,
+                         PowerUp.bobbed_y, PowerUp.draw)
+            surfaces = cache.get("sprites", params, functions, self.bake_all)
+        else:
+            surfaces = self.bake_all()
+        self.sprites = dict(zip(keys, surfaces))
+    
+    def templates(self):
+        # (sprite key, entity posed for it) for every sprite; the entity is
+        # only valid until the next one is yielded
+        template_rng = random.Random(0)
         
-        # Layer 1: Distant peaks (lightest, furthest)
-        distant_points = []
-        # Extend range to cover full width plus extra to prevent gaps
-        for x in range(70, SCREEN_WIDTH - 70, 12):
-            # Create jagged, tall peaks like Himalayas
-            base_height = 200 + math.sin((x + camera_offset * 0.3) * 0.008) * 40
-            # Add sharp peaks
-            peak_variation = math.sin((x + camera_offset * 0.3) * 0.03) * 60
-            jagged_variation = math.sin((x + camera_offset * 0.3) * 0.1) * 20
-            height = base_height + peak_variation + jagged_variation
-            distant_points.append((x, SCREEN_HEIGHT - height))
-        # Ensure full coverage by adding corner points
-        distant_points.extend([(SCREEN_WIDTH, SCREEN_HEIGHT), (0, SCREEN_HEIGHT)])
-        pygame.draw.polygon(self.screen, (190, 200, 220), distant_points)
+        for enemy_type in ["crow", "khukuri"]:
+            enemy = Enemy(self.PADDING, self.PADDING, enemy_type, template_rng)
+            frames = 72 if enemy_type == "khukuri" else 1
+            for frame in range(frames):
+                enemy.rotation = frame * 5
+                yield enemy.sprite_key(), enemy
         
-        # Layer 2: Middle range (medium tone)
-        middle_points = []
-        for x in range(70, SCREEN_WIDTH - 70, 10):
-            base_height = 160 + math.sin((x + camera_offset * 0.5) * 0.012) * 50
-            # Different peak pattern
-            peak_variation = math.sin((x + camera_offset * 0.5) * 0.025) * 45
-            jagged_variation = math.sin((x + camera_offset * 0.5) * 0.08) * 15
-            height = base_height + peak_variation + jagged_variation
-            middle_points.append((x, SCREEN_HEIGHT - height))
-        middle_points.extend([(SCREEN_WIDTH, SCREEN_HEIGHT), (0, SCREEN_HEIGHT)])
-        pygame.draw.polygon(self.screen, (150, 160, 180), middle_points)
+        for powerup_type in ["chiyaa", "prayer_wheel"]:
+            powerup = PowerUp(self.PADDING, self.PADDING, powerup_type)
+            yield powerup.sprite_key(), powerup
         
-        # Layer 3: Near mountains (darkest, closest)
-        near_points = []
-        for x in range(70, SCREEN_WIDTH - 70, 8):
-            base_height = 120 + math.sin((x + camera_offset * 0.7) * 0.015) * 35
-            # Sharp, dramatic peaks
-            peak_variation = math.sin((x + camera_offset * 0.7) * 0.04) * 40
-            jagged_variation = math.sin((x + camera_offset * 0.7) * 0.12) * 12
-            height = base_height + peak_variation + jagged_variation
-            near_points.append((x, SCREEN_HEIGHT - height))
-        near_points.extend([(SCREEN_WIDTH, SCREEN_HEIGHT), (0, SCREEN_HEIGHT)])
-        pygame.draw.polygon(self.screen, (110, 120, 140), near_points)
+        # Normal look and the white invincibility flash
+        player = Player(self.PADDING, self.PADDING)
+        yield player.sprite_key(), player
+        player.activate_invincibility()
+        player.invincible_timer = 10
+        yield player.sprite_key(), player
+    
+    def bake_all(self):
+        return [self.bake(entity) for _, entity in self.templates()]
+    
+    def bake(self, entity):
+        surface = pygame.Surface((entity.width + self.PADDING * 2, entity.height + self.PADDING * 2), pygame.SRCALPHA)
+        entity.draw(surface)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
+    
+    def blit(self, screen, key, x, y, camera):
+        # (x, y) is the entity's top-left corner in world space
+        return screen.blit(self.sprites[key], (x - self.PADDING, camera.screen_y(y) - self.PADDING))
+
+class Camera:
+    # World-to-screen transform for the vertical scroll (world x is already
+    # screen x). Entities within MARGIN pixels of the view still get drawn.
+    MARGIN = 50
+    
+    def __init__(self):
+        self.y = 0
+        # Fraction of a simulation step elapsed since the last update
+        self.alpha = 1.0
+    
+    def follow(self, world, alpha=1.0):
+        # Nothing moves once the game is over, so the previous positions are stale
+        self.alpha = 1.0 if world.game_over else alpha
+        self.y = world.prev_camera_y + (world.camera_y - world.prev_camera_y) * self.alpha
+    
+    def interpolate(self, entity):
+        # Render position between the entity's last two simulated positions
+        alpha = self.alpha
+        return (entity.prev_x + (entity.x - entity.prev_x) * alpha,
+                entity.prev_y + (entity.y - entity.prev_y) * alpha)
+    
+    def screen_y(self, y):
+        return y - self.y
+    
+    def parallax(self, factor):
+        # Scroll offset for background layers that move slower than the world
+        return self.y * factor
+    
+    def cull(self, entities):
+        # Culling pass: yields only entities near the view, without copying
+        top = self.y - self.MARGIN
+        bottom = self.y + SCREEN_HEIGHT + self.MARGIN
+        for entity in entities:
+            if top < entity.y < bottom:
+                yield entity
+
+class DirtyRects:
+    # Partial display updates: collects the screen regions drawn this frame and
+    # pushes only those (plus last frame's, to erase what moved away) with
+    # pygame.display.update. Falls back to a full flip when most of the screen
+    # changed anyway.
+    FULL_UPDATE_RATIO = 0.6
+    # Past this many regions a frame is busy enough to flip without measuring
+    MAX_RECTS = 48
+    # Overlap is measured on a grid of CELL-pixel squares
+    CELL = 8
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        # One byte per grid cell, set where a region touches it
+        self.coverage = pygame.Surface((-(-SCREEN_WIDTH // self.CELL), -(-SCREEN_HEIGHT // self.CELL)), 0, 8)
+        self.coverage.set_colorkey(0)
+        self.current = []
+        self.previous = []
+        # The first frame, and anything drawn outside the tracked regions
+        # (like the game over overlay), needs a full repaint
+        self.invalidated = True
+        self.was_invalidated = False
+    
+    def add(self, rect):
+        if self.enabled and rect is not None:
+            self.current.append(rect)
+    
+    def invalidate(self):
+        self.invalidated = True
+    
+    def present(self):
+        if not self.enabled:
+            pygame.display.flip()
+            return
+        
+        # A full repaint last frame leaves nothing to erase by region, so the
+        # frame after an invalidation is pushed in full as well
+        full = self.invalidated or self.was_invalidated
+        # Regions that didn't move (the scrolling walls) show up in both
+        # frames; count and push them once
+        rects = list({tuple(rect): rect for rect in self.current + self.previous}.values())
+        if not full:
+            limit = SCREEN_WIDTH * SCREEN_HEIGHT * self.FULL_UPDATE_RATIO
+            # The plain sum is an upper bound; overlaps (HUD over the walls,
+            # sprites over the mountains) only need resolving when it's over
+            if sum(rect.width * rect.height for rect in rects) > limit:
+                full = len(rects) > self.MAX_RECTS or self.covered_area(rects) > limit
+        
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        
+        self.previous = self.current
+        self.current = []
+        self.was_invalidated = self.invalidated
+        self.invalidated = False
+    
+    def covered_area(self, rects):
+        # Screen area under rects with overlaps counted once, rounded out to
+        # whole grid cells; the fills and the count all run in pygame
+        cell = self.CELL
+        coverage = self.coverage
+        coverage.fill(0)
+        for rect in rects:
+            left = rect.left // cell
+            top = rect.top // cell
+            coverage.fill(1, (left, top, -(-rect.right // cell) - left, -(-rect.bottom // cell) - top))
+        return pygame.mask.from_surface(coverage).count() * cell * cell
+
+class QualityGovernor:
+    # Sheds background detail while frames run over budget and restores it once
+    # they recover, so the same build holds its frame rate on weak and strong
+    # hardware. Frame times are the work done per frame, not the time spent
+    # waiting for the next frame or for a vsynced present, so a capped game can
+    # still tell it has headroom.
+    LEVELS = ("full", "one cloud pass", "no clouds", "two mountain layers", "one mountain layer", "flat sky")
+    
+    # Mean frame time, as a fraction of the budget, that sheds a level or earns one back
+    SHED_RATIO = 0.9
+    RESTORE_RATIO = 0.5
+    # Fast windows in a row needed before detail comes back, so it doesn't flicker
+    RESTORE_WINDOWS = 4
+    
+    def __init__(self, target_fps=FPS, window=30, level=None):
+        self.budget = 1.0 / target_fps
+        self.window = window
+        # Pinning a level turns the governor off
+        self.adaptive = level is None
+        self.level = level or 0
+        self.total = 0.0
+        self.samples = 0
+        self.fast_windows = 0
+    
+    def record(self, seconds):
+        # Returns True when the quality level changed
+        if not self.adaptive:
+            return False
+        self.total += seconds
+        self.samples += 1
+        if self.samples < self.window:
+            return False
+        
+        mean = self.total / self.samples
+        self.total = 0.0
+        self.samples = 0
+        if mean > self.budget * self.SHED_RATIO:
+            self.fast_windows = 0
+            if self.level < len(self.LEVELS) - 1:
+                self.level += 1
+                return True
+        elif mean < self.budget * self.RESTORE_RATIO and self.level > 0:
+            self.fast_windows += 1
+            if self.fast_windows >= self.RESTORE_WINDOWS:
+                self.fast_windows = 0
+                self.level -= 1
+                return True
+        else:
+            self.fast_windows = 0
+        return False
+    
+    def cloud_passes(self):
+        return max(0, 2 - self.level)
+    
+    def mountain_layers(self):
+        # Furthest layers go first
+        return len(ParallaxBackground.LAYERS) - min(2, max(0, self.level - 2))
+    
+    def flat_sky(self):
+        return self.level >= 5
+
+class TextCache:
+    # LRU cache of rendered text surfaces keyed on (font, text, color), so HUD
+    # strings are only rasterized when the value they show changes
+    def __init__(self, capacity=64, compose_digits=False):
+        self.capacity = capacity
+        # Build numeric counters from cached per-digit glyphs instead of
+        # rendering a new surface for every value
+        self.compose_digits = compose_digits
+        self.surfaces = OrderedDict()
+    
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+    
+    def draw_counter(self, screen, font, label, value, color, pos, suffix=""):
+        # Draws label + value + suffix at pos and returns the covered rect
+        if not self.compose_digits:
+            return screen.blit(self.render(font, f"{label}{value}{suffix}", color), pos)
+        
+        x, y = pos
+        rect = screen.blit(self.render(font, label, color), (x, y))
+        for part in (*str(value), suffix):
+            if part:
+                rect.union_ip(screen.blit(self.render(font, part, color), (rect.right, y)))
+        return rect
+
+class Game:
+    def __init__(self, dirty_rects=False, profiler=None, record_path=None, max_fps=FPS, vsync=False, quality=None,
+                 report_startup=False, scores=None, asset_cache=None):
+        # Startup phases for report_startup: imports, window, assets, then the
+        # first frame
+        self.report_startup = report_startup
+        self.init_started = time.perf_counter()
+        
+        pygame.display.init()
+        pygame.font.init()
+        self.screen = None
+        if vsync:
+            # pygame only honours vsync on renderer-backed (SCALED) windows
+            try:
+                self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+            except pygame.error:
+                print("vsync is not available here; rendering without it", file=sys.stderr)
+        # With vsync on, presenting a frame blocks until the vertical blank
+        self.vsync = self.screen is not None
+        if self.screen is None:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Mandir Jumper")
+        self.window_finished = time.perf_counter()
+        # Render frame cap; 0 renders as fast as possible (or at the vsync rate).
+        # The simulation always advances in fixed STEP_SECONDS steps.
+        self.max_fps = max_fps
+        
+        # Game state; inputs are logged when the session is saved as a replay
+        self.record_path = record_path
+        self.world = World(record=record_path is not None)
+        
+        # UI Font
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.text = TextCache(compose_digits=True)
+        self.overlay = None
+        
+        # Optional asset_cache.AssetCache; baked surfaces are loaded from it
+        # when they haven't changed, instead of being drawn again
+        self.asset_cache = asset_cache
+        
+        # Pre-rendered sky and mountain layers, and cloud puffs by radius
+        self.background = ParallaxBackground(asset_cache)
+        self.cloud_puffs = {}
+        # Background detail level; adaptive unless pinned with quality
+        self.quality = QualityGovernor(level=quality)
+        
+        # Pre-rendered, scrolling temple walls
+        self.walls = WallTiles(asset_cache)
+        
+        # Pre-rendered entity sprites
+        self.atlas = SpriteAtlas(asset_cache)
+        self.camera = Camera()
+        
+        # Full flips by default; dirty_rects pushes only changed regions
+        self.dirty = DirtyRects(dirty_rects)
+        
+        # Optional profiler.FrameProfiler; None keeps the frame loop uninstrumented
+        self.profiler = profiler
+        
+        # Optional scores.ScoreLog for durable high scores and run telemetry,
+        # with this run's frame times and the deaths already logged
+        self.scores = scores
+        self.frame_times = []
+        self.logged_deaths = 0
+        
+        # (arrival time, event) inputs waiting for the simulation step that
+        # covers their arrival, arrival times of jumps applied but not yet
+        # shown, and the arrival time of a press waiting in the jump buffer
+        self.pending_inputs = deque()
+        self.unshown_jumps = []
+        self.buffered_jump = None
+        self.input_latencies = []
+        self.init_finished = time.perf_counter()
+    
+    def handle_events(self, now):
+        # Events queued since the last poll are stamped with this frame's start
+        for event in pygame.event.get():
+            if not self.handle_event(event, now):
+                return False
+        return True
+    
+    def handle_event(self, event, arrived):
+        # Queues player input stamped with its arrival time; False on quit
+        if event.type == pygame.QUIT:
+            return False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                self.pending_inputs.append((arrived, JUMP))
+            elif event.key == pygame.K_r and self.world.game_over:
+                self.pending_inputs.append((arrived, RESTART))
+            elif event.key == pygame.K_F3 and self.profiler:
+                self.profiler.show_overlay = not self.profiler.show_overlay
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.pending_inputs.append((arrived, RESTART if self.world.game_over else JUMP))
+        return True
+    
+    def apply_inputs(self, step_end):
+        # Feed the world every input that arrived before the end of the
+        # simulation step about to run
+        pending = self.pending_inputs
+        while pending and pending[0][0] < step_end:
+            arrived, event = pending.popleft()
+            if self.world.input(event):
+                self.unshown_jumps.append(arrived)
+            elif event == JUMP and self.world.jump_buffer:
+                # Pressed mid-air; each press restarts the buffer, so the
+                # jump is measured from the latest one once it takes off
+                self.buffered_jump = arrived
+    
+    def wait_for_frame(self, deadline):
+        # Sleeps until deadline but takes input the moment it arrives, so a
+        # press is stamped with when it happened rather than the next poll.
+        # False on quit.
+        while True:
+            # Whole milliseconds only; finishing a fraction early beats running late
+            timeout = int((deadline - time.perf_counter()) * 1000)
+            if timeout <= 0:
+                return True
+            event = pygame.event.wait(timeout)
+            if event.type != pygame.NOEVENT and not self.handle_event(event, time.perf_counter()):
+                return False
+    
+    def update(self):
+        self.world.update()
+        if self.buffered_jump is not None:
+            if self.world.buffered_jump_started:
+                self.unshown_jumps.append(self.buffered_jump)
+                self.buffered_jump = None
+            elif not self.world.jump_buffer:
+                # Expired before landing, or the game ended
+                self.buffered_jump = None
+        if self.scores and self.world.deaths != self.logged_deaths:
+            self.logged_deaths = self.world.deaths
+            self.log_run()
+    
+    def log_run(self):
+        # Hands the finished run to the background writer
+        world = self.world
+        self.scores.record_run(world.score, world.game_start_timer, world.death_cause or "quit",
+                               world.powerups_collected, self.frame_times, world.seed, self.input_latencies)
+        self.frame_times = []
+        self.input_latencies = []
+    
+    def highscore(self):
+        # Best of this session and, once loaded, every earlier one
+        best = self.world.highscore
+        if self.scores and self.scores.best is not None:
+            best = max(best, self.scores.best)
+        return best
+    
+    def draw_background(self, camera):
+        # Himalayan sky and mountain range, baked once in ParallaxBackground
+        camera_offset = camera.parallax(0.05)  # Slower parallax for distant mountains
+        quality = self.quality
+        self.dirty.add(self.background.draw(self.screen, camera_offset, quality.mountain_layers(), quality.flat_sky()))
+        if self.profiler:
+            self.profiler.mark("draw_background")
         
         # Add some clouds drifting between mountains
-        self.draw_mountain_clouds(camera_offset)
+        self.draw_mountain_clouds(camera_offset, quality.cloud_passes())
     
-    def draw_mountain_clouds(self, camera_offset):
+    def cloud_puff(self, radius):
+        # Semi-transparent white circle, made once per radius
+        puff = self.cloud_puffs.get(radius)
+        if puff is None:
+            puff = pygame.Surface((radius * 2, radius * 2))
+            puff.set_alpha(120)
+            puff.fill((255, 255, 255))
+            pygame.draw.circle(puff, (255, 255, 255), (radius, radius), radius)
+            self.cloud_puffs[radius] = puff
+        return puff
+    
+    def draw_mountain_clouds(self, camera_offset, passes=2):
         # Draw wispy clouds between mountain layers
         cloud_offset = camera_offset * 0.02  # Very slow movement
-        for i in range(2):
+        for i in range(passes):
             cloud_x = 120 + i * 120 + (cloud_offset % 300)
             cloud_y = SCREEN_HEIGHT - 180 + i * 40
             
@@ -461,95 +1373,95 @@ class Game:
                 circle_x = cloud_x + j * 12 - 18
                 circle_y = cloud_y + math.sin(j + cloud_offset * 0.1) * 3
                 radius = 8 - abs(j - 1.5) * 2
-                # Semi-transparent white clouds
-                cloud_surface = pygame.Surface((radius * 2, radius * 2))
-                cloud_surface.set_alpha(120)
-                cloud_surface.fill((255, 255, 255))
-                pygame.draw.circle(cloud_surface, (255, 255, 255), (radius, radius), radius)
-                self.screen.blit(cloud_surface, (circle_x - radius, circle_y - radius))
-    
-    def draw_walls(self):
-        # Left wall
-        pygame.draw.rect(self.screen, DARK_BROWN, (0, 0, 80, SCREEN_HEIGHT))
-        # Right wall
-        pygame.draw.rect(self.screen, DARK_BROWN, (SCREEN_WIDTH - 80, 0, 80, SCREEN_HEIGHT))
-        
-        # Wall decorations
-        for i in range(0, SCREEN_HEIGHT, 50):
-            pygame.draw.rect(self.screen, BROWN, (10, i, 60, 10))
-            pygame.draw.rect(self.screen, BROWN, (SCREEN_WIDTH - 70, i, 60, 10))
-    
-    def draw(self):
-        self.draw_background()
-        self.draw_walls()
-        
-        # Draw game objects (adjusted for camera)
-        camera_offset = self.camera_y
-        
-        # Draw enemies
-        for enemy in self.enemies:
-            if -50 < enemy.y - camera_offset < SCREEN_HEIGHT + 50:
-                enemy_copy = Enemy(enemy.x, enemy.y - camera_offset, enemy.type)
-                enemy_copy.rotation = enemy.rotation
-                enemy_copy.draw(self.screen)
-        
-        # Draw power-ups
-        for powerup in self.powerups:
-            if -50 < powerup.y - camera_offset < SCREEN_HEIGHT + 50:
-                powerup_copy = PowerUp(powerup.x, powerup.y - camera_offset, powerup.type)
-                powerup_copy.bob_offset = powerup.bob_offset
-                powerup_copy.draw(self.screen)
-        
-        # Draw player
-        player_copy = Player(self.player.x, self.player.y - camera_offset)
-        player_copy.invincible = self.player.invincible
-        player_copy.invincible_timer = self.player.invincible_timer
-        player_copy.draw(self.screen)
+                self.dirty.add(self.screen.blit(self.cloud_puff(radius), (circle_x - radius, circle_y - radius)))
+    
+    def draw_walls(self, camera):
+        for rect in self.walls.draw(self.screen, camera.y):
+            self.dirty.add(rect)
+    
+    def draw(self, alpha=1.0):
+        # alpha: how far between the last two simulation steps to render
+        profiler = self.profiler
+        self.camera.follow(self.world, alpha)
+        self.draw_background(self.camera)
+        if profiler:
+            profiler.mark("draw_mountain_clouds")
+        self.draw_walls(self.camera)
+        if profiler:
+            profiler.mark("draw_walls")
+        self.draw_entities(self.camera)
+        if profiler:
+            profiler.mark("draw_entities")
         
         # Draw UI
         self.draw_ui()
         
-        if self.game_over:
+        if self.world.game_over:
             self.draw_game_over()
+            # The overlay darkens the whole screen
+            self.dirty.invalidate()
+        
+        if profiler and profiler.show_overlay:
+            profiler.draw_overlay(self.screen, self.small_font)
+            self.dirty.invalidate()
+        if profiler:
+            profiler.mark("draw_ui")
         
-        pygame.display.flip()
+        self.rendered = time.perf_counter()
+        self.dirty.present()
+        if profiler:
+            profiler.mark("display")
+    
+    def draw_entities(self, camera):
+        # Draw enemies
+        for enemy in camera.cull(self.world.enemies):
+            x, y = camera.interpolate(enemy)
+            self.dirty.add(self.atlas.blit(self.screen, enemy.sprite_key(), x, y, camera))
+        
+        # Draw power-ups
+        for powerup in camera.cull(self.world.powerups):
+            self.dirty.add(self.atlas.blit(self.screen, powerup.sprite_key(), powerup.x, powerup.bobbed_y(), camera))
+        
+        # Draw player
+        player = self.world.player
+        x, y = camera.interpolate(player)
+        self.dirty.add(self.atlas.blit(self.screen, player.sprite_key(), x, y, camera))
     
     def draw_ui(self):
+        player = self.world.player
+        
         # Highscore
-        highscore_text = self.font.render(f"High Score: {self.highscore}", True, BLACK)
-        self.screen.blit(highscore_text, (10, 10))
+        self.dirty.add(self.text.draw_counter(self.screen, self.font, "High Score: ", self.highscore(), BLACK, (10, 10)))
         
         # Score
-        score_text = self.font.render(f"Score: {self.score}", True, BLACK)
-        self.screen.blit(score_text, (10, 50))
+        self.dirty.add(self.text.draw_counter(self.screen, self.font, "Score: ", self.world.score, BLACK, (10, 50)))
         
         # Power-up status
         y_offset = 50
-        if self.player.speed_boost:
-            boost_text = self.small_font.render(f"Chiyaa: {self.player.speed_boost_timer//60 + 1}s", True, ORANGE)
-            self.screen.blit(boost_text, (10, y_offset))
+        if player.speed_boost:
+            self.dirty.add(self.text.draw_counter(self.screen, self.small_font, "Chiyaa: ", player.speed_boost_timer//60 + 1, ORANGE, (10, y_offset), "s"))
             y_offset += 25
         
-        if self.player.invincible:
-            invincible_text = self.small_font.render(f"Prayer Wheel: {self.player.invincible_timer//60 + 1}s", True, GOLD)
-            self.screen.blit(invincible_text, (10, y_offset))
+        if player.invincible:
+            self.dirty.add(self.text.draw_counter(self.screen, self.small_font, "Prayer Wheel: ", player.invincible_timer//60 + 1, GOLD, (10, y_offset), "s"))
         
         # Instructions
-        instruction_text = self.small_font.render("SPACE/Click to jump", True, (100, 100, 100))
-        self.screen.blit(instruction_text, (10, SCREEN_HEIGHT - 30))
+        instruction_text = self.text.render(self.small_font, "SPACE/Click to jump", (100, 100, 100))
+        self.dirty.add(self.screen.blit(instruction_text, (10, SCREEN_HEIGHT - 30)))
     
     def draw_game_over(self):
         # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        if self.overlay is None:
+            self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.overlay.set_alpha(128)
+            self.overlay.fill(BLACK)
+        self.screen.blit(self.overlay, (0, 0))
         
         # Game over text
-        game_over_text = self.font.render("Game Over!", True, WHITE)
-        score_text = self.font.render(f"Final Score: {self.score}", True, WHITE)
-        highscore_text = self.font.render(f"High Score: {self.highscore}", True, GOLD)
-        restart_text = self.small_font.render("Press R or Click to restart", True, WHITE)
+        game_over_text = self.text.render(self.font, "Game Over!", WHITE)
+        score_text = self.text.render(self.font, f"Final Score: {self.world.score}", WHITE)
+        highscore_text = self.text.render(self.font, f"High Score: {self.highscore()}", GOLD)
+        restart_text = self.text.render(self.small_font, "Press R or Click to restart", WHITE)
         
         # Center the text
         self.screen.blit(game_over_text, game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 70)))
@@ -558,16 +1470,164 @@ class Game:
         self.screen.blit(restart_text, restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60)))
     
     def run(self):
+        # Fixed-timestep loop: real time is spent in whole simulation steps,
+        # so gameplay runs at the same pace whatever the render rate. Each
+        # step covers STEP_SECONDS of real time and takes the inputs that
+        # arrived during it. The leftover fraction of a step interpolates
+        # the frame.
         running = True
+        # Real time the simulation has caught up to, and when the next frame is due
+        simulated = time.perf_counter()
+        next_frame = simulated
+        first_frame = True
         while running:
-            running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            profiler = self.profiler
+            if profiler:
+                profiler.start_frame()
+            now = time.perf_counter()
+            running = self.handle_events(now)
+            if profiler:
+                profiler.mark("handle_events")
+            steps = 0
+            while simulated + STEP_SECONDS <= now and steps < MAX_CATCH_UP_STEPS:
+                simulated += STEP_SECONDS
+                self.apply_inputs(simulated)
+                self.update()
+                steps += 1
+            if simulated + STEP_SECONDS <= now:
+                # Too far behind to catch up; let the game slow down instead
+                simulated = now
+            if profiler:
+                profiler.mark("update")
+            self.draw((now - simulated) / STEP_SECONDS)
+            shown = time.perf_counter()
+            frame_time = shown - now
+            if self.unshown_jumps:
+                # Press-to-screen latency of the jumps this frame first shows
+                for arrived in self.unshown_jumps:
+                    self.input_latencies.append(shown - arrived)
+                    if profiler:
+                        profiler.record_input_latency(shown - arrived)
+                self.unshown_jumps.clear()
+            if self.scores and not self.world.game_over:
+                self.frame_times.append(frame_time)
+            # The governor judges the work done per frame; a vsynced present
+            # waits for the display and would read as a full budget every frame
+            if self.quality.record(self.rendered - now if self.vsync else frame_time):
+                # Background layers appeared or vanished outside the tracked regions
+                self.dirty.invalidate()
+            if first_frame:
+                first_frame = False
+                if self.report_startup:
+                    self.print_startup(time.perf_counter())
+                    running = False
+            if self.max_fps and running:
+                # Frames are due on a fixed cadence; a late frame resets it
+                next_frame = max(next_frame + 1.0 / self.max_fps, time.perf_counter())
+                running = self.wait_for_frame(next_frame)
+            if profiler:
+                profiler.mark("tick")
+                profiler.end_frame(self.world)
         
+        if self.record_path:
+            from replay import Replay
+            Replay.from_world(self.world).save(self.record_path)
+        if self.scores:
+            # Log the run in progress too, then wait for the writer to finish
+            if not self.world.game_over and self.world.score:
+                self.log_run()
+            self.scores.close()
+        if self.asset_cache:
+            self.asset_cache.close()
+        if self.profiler:
+            self.profiler.close()
+            print("\n".join(self.profiler.summary_lines(self.world)))
         pygame.quit()
         sys.exit()
+    
+    def print_startup(self, first_frame_shown):
+        phases = [
+            ("imports", self.init_started - IMPORT_STARTED),
+            ("window", self.window_finished - self.init_started),
+            ("assets", self.init_finished - self.window_finished),
+            ("first frame", first_frame_shown - self.init_finished),
+        ]
+        if self.asset_cache is None:
+            start = "uncached"
+        elif self.asset_cache.baked:
+            # Cold: something was baked and is being written for next time
+            start = f"cold, baked {', '.join(self.asset_cache.baked)}"
+        else:
+            start = "warm, assets loaded from cache"
+        print(", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in phases)
+              + f"; total {(first_frame_shown - IMPORT_STARTED) * 1000:.1f} ms ({start})")
+
+def jump_every(frames):
+    # Simple scripted bot: jump at a fixed cadence
+    return lambda world: world.frame % frames == 0
+
+def run_headless(frames, seed=None, stress=None):
+    if stress:
+        # NumPy-backed entity store; only needed for stress runs
+        from swarm import SwarmWorld
+        world = SwarmWorld(seed, spawn_batch=stress)
+    else:
+        world = World(seed)
+    start = time.perf_counter()
+    world.run(frames, jump_every(45), stop_on_game_over=False)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} frames/s)")
+    print(f"Games ended: {world.deaths}, high score: {world.highscore}")
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Mandir Jumper")
+    parser.add_argument("--headless", type=int, metavar="FRAMES",
+                        help="simulate FRAMES frames without a window and print stats")
+    parser.add_argument("--seed", type=int, help="seed for the simulation RNG")
+    parser.add_argument("--stress", type=int, metavar="BATCH",
+                        help="headless only: spawn BATCH enemies per spawn using the NumPy entity store")
+    parser.add_argument("--profile", nargs="?", const="", metavar="FILE",
+                        help="time each frame phase (F3 toggles the overlay); optionally dump per-frame records to FILE (.csv or .json)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="save the session's seed and inputs to FILE on exit for replay verification")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="update only the changed parts of the screen instead of full flips")
+    parser.add_argument("--fps", type=int, metavar="N",
+                        help=f"cap rendering at N frames per second, 0 for uncapped (default {FPS}, or uncapped with --vsync); "
+                             f"the simulation always runs at {FPS} steps/s")
+    parser.add_argument("--vsync", action="store_true",
+                        help="sync rendering to the display refresh rate")
+    parser.add_argument("--quality", type=int, choices=range(len(QualityGovernor.LEVELS)), metavar="LEVEL",
+                        help="pin background detail at LEVEL (0 full to 5 flat sky) instead of adapting to frame times")
+    parser.add_argument("--scores", metavar="FILE",
+                        help="log of high scores and per-run telemetry (default ~/.mandir_jumper/runs.jsonl)")
+    parser.add_argument("--no-scores", action="store_true",
+                        help="don't load or save high scores and run telemetry")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print how long startup took up to the first frame on screen, then exit")
+    parser.add_argument("--asset-cache", metavar="DIR",
+                        help="directory for cached pre-rendered surfaces (default ~/.mandir_jumper/assets)")
+    parser.add_argument("--no-asset-cache", action="store_true",
+                        help="bake every surface at startup without reading or writing the asset cache")
+    args = parser.parse_args()
+    
+    if args.headless is not None:
+        run_headless(args.headless, args.seed, args.stress)
+    else:
+        profiler = None
+        if args.profile is not None:
+            from profiler import FrameProfiler
+            profiler = FrameProfiler(record_path=args.profile or None)
+        scores = None
+        if not args.no_scores:
+            from scores import ScoreLog, DEFAULT_PATH
+            scores = ScoreLog(args.scores or DEFAULT_PATH)
+        asset_cache = None
+        if not args.no_asset_cache:
+            from asset_cache import AssetCache, DEFAULT_DIRECTORY
+            asset_cache = AssetCache(args.asset_cache or DEFAULT_DIRECTORY)
+        max_fps = args.fps if args.fps is not None else (0 if args.vsync else FPS)
+        game = Game(dirty_rects=args.dirty_rects, profiler=profiler, record_path=args.record,
+                    max_fps=max_fps, vsync=args.vsync, quality=args.quality, report_startup=args.startup_time,
+                    scores=scores, asset_cache=asset_cache)
+        game.run()
@@ -0,0 +1,125 @@
+import csv
+import gc
+import json
+import time
+from collections import deque
+
+# Per-phase frame timing for Game.run. The game calls mark(phase) after each
+# phase of a frame; the time since the previous mark is charged to that phase.
+
+PHASES = ("handle_events", "update", "draw_background", "draw_mountain_clouds",
+          "draw_walls", "draw_entities", "draw_ui", "display", "tick")
+
+class FrameProfiler:
+    def __init__(self, window=600, record_path=None):
+        # Rolling window of recent frames used for percentiles
+        self.window = {phase: deque(maxlen=window) for phase in PHASES + ("frame", "input_latency")}
+        # Optional per-frame records dumped to CSV or JSON on close
+        self.record_path = record_path
+        self.records = [] if record_path else None
+        self.show_overlay = False
+        self.overlay_lines = []
+        self.overlay_surfaces = []
+        self.frames = 0
+        
+        self.times = dict.fromkeys(PHASES, 0)
+        self.frame_start = 0
+        self.last_mark = 0
+        
+        # Garbage collector pauses that land inside the current frame
+        self.gc_count = 0
+        self.gc_ns = 0
+        self.gc_started = 0
+        self.gc_total_count = 0
+        self.gc_total_ns = 0
+        gc.callbacks.append(self.on_gc)
+    
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.gc_started = time.perf_counter_ns()
+        else:
+            self.gc_count += 1
+            self.gc_ns += time.perf_counter_ns() - self.gc_started
+    
+    def start_frame(self):
+        self.frame_start = self.last_mark = time.perf_counter_ns()
+        self.gc_count = 0
+        self.gc_ns = 0
+    
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        self.times[phase] += now - self.last_mark
+        self.last_mark = now
+    
+    def end_frame(self, world):
+        total = self.last_mark - self.frame_start
+        for phase in PHASES:
+            self.window[phase].append(self.times[phase])
+        self.window["frame"].append(total)
+        
+        if self.records is not None:
+            self.records.append((self.frames, total, *(self.times[phase] for phase in PHASES),
+                                 len(world.enemies), len(world.powerups), self.gc_count, self.gc_ns))
+        
+        self.gc_total_count += self.gc_count
+        self.gc_total_ns += self.gc_ns
+        self.frames += 1
+        self.times = dict.fromkeys(PHASES, 0)
+        
+        # Refresh the overlay text a few times a second rather than every frame
+        if self.show_overlay and self.frames % 15 == 0:
+            self.overlay_lines = self.summary_lines(world)
+            self.overlay_surfaces = None
+    
+    def record_input_latency(self, seconds):
+        # Time from a jump press to the first frame showing it
+        self.window["input_latency"].append(int(seconds * 1e9))
+    
+    def percentiles(self, phase, points=(50, 95, 99)):
+        # Nearest-rank percentiles over the rolling window, in milliseconds
+        samples = sorted(self.window[phase])
+        if not samples:
+            return [0.0 for _ in points]
+        last = len(samples) - 1
+        return [samples[min(last, len(samples) * point // 100)] / 1e6 for point in points]
+    
+    def summary_lines(self, world=None):
+        lines = [f"{'phase (ms)':<20} {'p50':>6} {'p95':>6} {'p99':>6}"]
+        for phase in ("frame",) + PHASES:
+            p50, p95, p99 = self.percentiles(phase)
+            lines.append(f"{phase:<20} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        if self.window["input_latency"]:
+            p50, p95, p99 = self.percentiles("input_latency")
+            lines.append(f"{'input latency':<20} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        if world is not None:
+            lines.append(f"enemies {len(world.enemies)}  power-ups {len(world.powerups)}")
+        lines.append(f"gc pauses {self.gc_total_count} ({self.gc_total_ns / 1e6:.1f} ms total)")
+        return lines
+    
+    def draw_overlay(self, screen, font):
+        if not self.show_overlay:
+            return
+        # Text is only re-rendered when the summary refreshes
+        if self.overlay_surfaces is None:
+            self.overlay_surfaces = [font.render(line, True, (0, 0, 0), (255, 255, 255)) for line in self.overlay_lines]
+        y = 90
+        for surface in self.overlay_surfaces:
+            screen.blit(surface, (84, y))
+            y += font.get_linesize()
+    
+    def close(self):
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        if self.records is None:
+            return
+        
+        # Frame times are in nanoseconds
+        columns = ["frame", "total_ns"] + [f"{phase}_ns" for phase in PHASES] + ["enemies", "powerups", "gc_count", "gc_ns"]
+        if self.record_path.endswith(".json"):
+            with open(self.record_path, "w") as f:
+                json.dump([dict(zip(columns, record)) for record in self.records], f)
+        else:
+            with open(self.record_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(self.records)
@@ -0,0 +1,150 @@
+import argparse
+import gzip
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mandir_jumper import World, FPS
+
+# Replays store the World seed plus every input event with the frame it
+# arrived on. Re-simulating those inputs headless reproduces the session
+# exactly, so a claimed score can be checked without watching the run.
+#
+# Events are packed as ints: (frames since previous event) * 2 + event,
+# where event is JUMP (0) or RESTART (1). Files ending in .gz are gzipped.
+
+# Version 2: spawns come from the seeded chunk layout (SpawnSchedule).
+# Version 3: jumps pressed just before landing are buffered.
+# Version 4: scheduled spawns are released by the game clock, not by height.
+# Older replays no longer reproduce.
+FORMAT_VERSION = 4
+
+# Longest session a replay may claim (a day of play), so a submitted file
+# can't tie up a verifier indefinitely
+MAX_FRAMES = FPS * 60 * 60 * 24
+
+class Replay:
+    def __init__(self, seed, events, frames, score, highscore):
+        self.seed = seed
+        # (frame, event) pairs in the order they were applied
+        self.events = events
+        self.frames = frames
+        self.score = score
+        self.highscore = highscore
+    
+    @classmethod
+    def from_world(cls, world):
+        return cls(world.seed, list(world.inputs), world.frame, world.score, world.highscore)
+    
+    def to_dict(self):
+        packed = []
+        previous = 0
+        for frame, event in self.events:
+            packed.append((frame - previous) * 2 + event)
+            previous = frame
+        return {
+            "version": FORMAT_VERSION,
+            "seed": self.seed,
+            "frames": self.frames,
+            "events": packed,
+            "score": self.score,
+            "highscore": self.highscore,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        # Replays are untrusted input: anything off-format is a ValueError
+        if not isinstance(data, dict):
+            raise ValueError("not a replay object")
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported replay version: {data.get('version')}")
+        seed = data.get("seed")
+        if not isinstance(seed, int) or isinstance(seed, bool):
+            raise ValueError("seed must be an integer")
+        for field in ("frames", "score", "highscore"):
+            if not is_count(data.get(field)):
+                raise ValueError(f"{field} must be a non-negative integer")
+        if data["frames"] > MAX_FRAMES:
+            raise ValueError(f"frames exceeds the {MAX_FRAMES} frame limit")
+        if not isinstance(data.get("events"), list) or not all(is_count(value) for value in data["events"]):
+            raise ValueError("events must be a list of non-negative integers")
+        events = []
+        frame = 0
+        for value in data["events"]:
+            frame += value // 2
+            events.append((frame, value % 2))
+        return cls(data["seed"], events, data["frames"], data["score"], data["highscore"])
+    
+    def save(self, path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+    
+    @classmethod
+    def load(cls, path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            return cls.from_dict(json.load(f))
+    
+    def simulate(self):
+        # Fast-forward the recorded inputs through a fresh headless World
+        world = World(self.seed)
+        events = iter(self.events)
+        upcoming = next(events, None)
+        for frame in range(self.frames):
+            while upcoming is not None and upcoming[0] == frame:
+                world.input(upcoming[1])
+                upcoming = next(events, None)
+            if upcoming is None and world.game_over:
+                # Nothing left can restart the game, so the scores are final
+                break
+            world.update()
+        return world
+
+def is_count(value):
+    # bool is an int subclass but never a valid count
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def verify_file(path):
+    # Returns (path, ok, message); used directly and from worker processes.
+    # Never raises, so one bad submission can't take down a whole batch.
+    try:
+        replay = Replay.load(path)
+    except (OSError, ValueError) as error:
+        return path, False, f"unreadable: {error}"
+    except Exception as error:
+        return path, False, f"unreadable: {type(error).__name__}: {error}"
+    try:
+        world = replay.simulate()
+    except Exception as error:
+        return path, False, f"simulation failed: {type(error).__name__}: {error}"
+    if world.score == replay.score and world.highscore == replay.highscore:
+        return path, True, f"score {replay.score}, high score {replay.highscore}"
+    return path, False, (f"claimed score {replay.score}/high score {replay.highscore}, "
+                         f"replayed {world.score}/{world.highscore}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify Mandir Jumper replays")
+    parser.add_argument("replays", nargs="+", help="replay files recorded with --record")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="worker processes (default: one per CPU; 1 verifies in-process)")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    if args.jobs == 1:
+        results = [verify_file(path) for path in args.replays]
+    else:
+        with ProcessPoolExecutor(args.jobs) as pool:
+            results = list(pool.map(verify_file, args.replays, chunksize=8))
+    
+    failures = 0
+    for path, ok, message in results:
+        print(f"{'OK  ' if ok else 'FAIL'} {path}: {message}")
+        failures += not ok
+    elapsed = time.perf_counter() - start
+    print(f"{len(args.replays) - failures}/{len(args.replays)} replays verified in {elapsed:.2f}s", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
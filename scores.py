@@ -0,0 +1,160 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+# Durable high scores and per-run telemetry. The game loop only enqueues
+# records; a background thread loads the log, batches appends to it and
+# compacts it, so nothing on the frame path waits on the disk.
+#
+# The log is JSON lines, one compact record per run. Once it grows past
+# COMPACT_AFTER lines it is rewritten as a single summary record (best score
+# and total runs) followed by the most recent KEEP_RUNS runs.
+
+COMPACT_AFTER = 1000
+KEEP_RUNS = 200
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".mandir_jumper", "runs.jsonl")
+
+# Log lines can be anything (hand edits, other versions); records that parse
+# as JSON but don't have these shapes are skipped
+
+def is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def is_run(record):
+    return isinstance(record, dict) and record.get("type") == "run" and is_count(record.get("score"))
+
+def is_summary(record):
+    return (isinstance(record, dict) and record.get("type") == "summary"
+            and is_count(record.get("best")) and is_count(record.get("runs")))
+
+def timing_summary(timings):
+    # Nearest-rank percentiles of a run's timings (seconds), in milliseconds
+    samples = sorted(timings)
+    if not samples:
+        return None
+    last = len(samples) - 1
+    summary = {f"p{point}": round(samples[min(last, len(samples) * point // 100)] * 1000, 3) for point in (50, 95, 99)}
+    summary["max"] = round(samples[-1] * 1000, 3)
+    return summary
+
+class ScoreLog:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        # Best score on record; None until the log has been read
+        self.best = None
+        self.runs = 0
+        self.lines = 0
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name="score-log", daemon=True)
+        self.thread.start()
+    
+    def record_run(self, score, frames, death_cause, powerups, frame_times, seed=None, input_latencies=()):
+        # Called from the game loop; never blocks. frame_times and
+        # input_latencies (seconds) are handed over to the writer, which
+        # summarizes them.
+        self.queue.put({
+            "type": "run",
+            "time": round(time.time(), 3),
+            "seed": seed,
+            "score": score,
+            "frames": frames,
+            "death": death_cause,
+            "powerups": powerups,
+            "frame_ms": frame_times,
+            "input_ms": input_latencies,
+        })
+    
+    def close(self):
+        # Flushes everything queued so far and stops the writer
+        self.queue.put(None)
+        self.thread.join()
+    
+    # Everything below runs on the writer thread
+    
+    def run(self):
+        # Errors are reported and survived; a dead writer would silently drop
+        # every run recorded after it
+        try:
+            self.load()
+        except Exception as error:
+            print(f"score log: {error}", file=sys.stderr)
+            self.best = 0
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [record for record in batch if record is not None]
+            # A failed write loses this batch but keeps the game running
+            try:
+                if batch:
+                    self.append(batch)
+                if self.lines > COMPACT_AFTER:
+                    self.compact()
+            except Exception as error:
+                print(f"score log: {error}", file=sys.stderr)
+    
+    def read(self):
+        records = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+    
+    def load(self):
+        best = 0
+        runs = 0
+        records = self.read()
+        for record in records:
+            if is_summary(record):
+                best = max(best, record["best"])
+                runs += record["runs"]
+            elif is_run(record):
+                best = max(best, record["score"])
+                runs += 1
+        self.lines = len(records)
+        self.runs = runs
+        self.best = best
+    
+    def append(self, records):
+        for record in records:
+            record["frame_ms"] = timing_summary(record["frame_ms"])
+            record["input_ms"] = timing_summary(record["input_ms"])
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self.lines += len(records)
+        self.runs += len(records)
+        self.best = max(self.best, *(record["score"] for record in records))
+    
+    def compact(self):
+        runs = [record for record in self.read() if is_run(record)][-KEEP_RUNS:]
+        records = [{"type": "summary", "best": self.best, "runs": self.runs - len(runs)}] + runs
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        # Atomic swap: a crash leaves either the old log or the new one
+        os.replace(temp_path, self.path)
+        self.lines = len(records)
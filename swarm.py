@@ -0,0 +1,185 @@
+import numpy as np
+
+from mandir_jumper import World, SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Stress-mode simulation: enemies and power-ups live in contiguous NumPy arrays
+# (structure of arrays) so movement, culling and collision tests run batched
+# instead of once per Python object.
+
+# Entity type codes stored in the type column
+CROW = 0
+KHUKURI = 1
+CHIYAA = 2
+PRAYER_WHEEL = 3
+TYPE_NAMES = ["crow", "khukuri", "chiyaa", "prayer_wheel"]
+
+# Hitbox width/height per type code, matching Enemy and PowerUp
+TYPE_WIDTH = np.array([25, 30, 20, 20], dtype=np.float64)
+TYPE_HEIGHT = np.array([20, 30, 20, 20], dtype=np.float64)
+
+class EntityStore:
+    FIELDS = ("x", "y", "speed", "direction", "fall_speed", "rotation", "bob_offset")
+    # Integer columns: type code, and the game instance an entity belongs to
+    # (always 0 in SwarmWorld; VecEnv packs many games into one store)
+    INT_FIELDS = ("type", "env")
+    
+    def __init__(self, capacity=256, bobbing=False):
+        # Power-up stores bob in place; enemy stores move, bounce and spin
+        self.bobbing = bobbing
+        self.count = 0
+        self.capacity = capacity
+        self.type = np.zeros(capacity, dtype=np.int8)
+        self.env = np.zeros(capacity, dtype=np.int32)
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+    
+    def __len__(self):
+        return self.count
+    
+    def reserve(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for name in self.INT_FIELDS + self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+    
+    def add(self, x, y, types, speed=0.0, direction=1.0, fall_speed=0.0, env=0):
+        x = np.atleast_1d(x)
+        n = len(x)
+        self.reserve(self.count + n)
+        new = slice(self.count, self.count + n)
+        self.x[new] = x
+        self.y[new] = y
+        self.type[new] = types
+        self.env[new] = env
+        self.speed[new] = speed
+        self.direction[new] = direction
+        self.fall_speed[new] = fall_speed
+        self.rotation[new] = 0
+        self.bob_offset[new] = 0
+        self.count += n
+    
+    def update(self):
+        n = self.count
+        if self.bobbing:
+            self.bob_offset[:n] += 0.2
+            return
+        
+        x = self.x[:n]
+        types = self.type[:n]
+        
+        # Horizontal movement and falling
+        x += self.speed[:n] * self.direction[:n]
+        self.y[:n] += self.fall_speed[:n]
+        
+        # Bounce off walls
+        bounce = (x <= 80) | (x >= SCREEN_WIDTH - 80 - TYPE_WIDTH[types])
+        self.direction[:n][bounce] *= -1
+        
+        # Rotation for spinning khukuris
+        self.rotation[:n][types == KHUKURI] += 5
+    
+    def keep(self, mask):
+        # Compact the live prefix down to the entities selected by mask
+        kept = int(np.count_nonzero(mask))
+        if kept == self.count:
+            return
+        for name in self.INT_FIELDS + self.FIELDS:
+            column = getattr(self, name)
+            column[:kept] = column[:self.count][mask]
+        self.count = kept
+    
+    def cull(self, limit):
+        # Drop everything that has fallen below limit (world y)
+        self.keep(self.y[:self.count] <= limit)
+    
+    def remove(self, indices):
+        mask = np.ones(self.count, dtype=bool)
+        mask[indices] = False
+        self.keep(mask)
+    
+    def overlapping(self, rect):
+        # Indices of entities whose hitbox overlaps rect
+        return np.flatnonzero(self.overlaps(rect.left, rect.top, rect.right, rect.bottom))
+    
+    def overlaps(self, left, top, right, bottom):
+        # Boolean mask of entities whose hitbox overlaps the given box, using the
+        # same truncation and edge rules as pygame.Rect.colliderect. The bounds
+        # may be scalars or one value per live entity.
+        n = self.count
+        types = self.type[:n]
+        y = self.y[:n]
+        if self.bobbing:
+            y = y + np.sin(self.bob_offset[:n]) * 3
+        entity_left = np.trunc(self.x[:n])
+        entity_top = np.trunc(y)
+        return ((entity_left < right) & (entity_left + TYPE_WIDTH[types] > left) &
+                (entity_top < bottom) & (entity_top + TYPE_HEIGHT[types] > top))
+
+class SwarmWorld(World):
+    # World variant for stress runs. spawn_batch enemies appear per scheduled
+    # spawn and spawn_rate (frames between spawns) overrides the score-based curve.
+    def __init__(self, seed=None, spawn_batch=1, spawn_rate=None, balance=None):
+        self.spawn_batch = spawn_batch
+        self.fixed_spawn_rate = spawn_rate
+        # Batched spawns draw from a NumPy generator seeded alongside World.random
+        self.np_random = np.random.default_rng(seed)
+        super().__init__(seed, balance=balance)
+    
+    def restart(self):
+        super().restart()
+        self.enemies = EntityStore()
+        self.powerups = EntityStore(capacity=16, bobbing=True)
+    
+    def spawn_enemy(self, entry):
+        n = self.spawn_batch
+        rng = self.np_random
+        self.enemies.add(
+            x=rng.integers(100, SCREEN_WIDTH - 120, n, endpoint=True),
+            y=self.camera_y - rng.integers(100, 300, n, endpoint=True),
+            types=rng.integers(CROW, KHUKURI, n, endpoint=True),
+            speed=rng.uniform(*self.balance.enemy_speed, n),
+            direction=rng.choice([-1.0, 1.0], n),
+            fall_speed=rng.uniform(*self.balance.enemy_fall_speed, n),
+        )
+    
+    def spawn_powerup(self, entry):
+        rng = self.np_random
+        self.powerups.add(
+            x=rng.integers(100, SCREEN_WIDTH - 120, endpoint=True),
+            y=self.camera_y - rng.integers(50, 200, endpoint=True),
+            types=rng.integers(CHIYAA, PRAYER_WHEEL, endpoint=True),
+        )
+    
+    def update_entities(self):
+        limit = self.camera_y + SCREEN_HEIGHT + 100
+        self.enemies.update()
+        self.enemies.cull(limit)
+        self.powerups.update()
+        self.powerups.cull(limit)
+    
+    def check_collisions(self):
+        # Check collisions with enemies
+        player_rect = self.player.get_rect()
+        if not self.player.invincible:
+            hits = self.enemies.overlapping(player_rect)
+            if len(hits):
+                self.game_over = True
+                self.death_cause = TYPE_NAMES[self.enemies.type[hits[0]]]
+                self.deaths += 1
+                return
+        
+        # Check collisions with power-ups
+        hits = self.powerups.overlapping(player_rect)
+        self.powerups_collected += len(hits)
+        for powerup_type in self.powerups.type[hits]:
+            if powerup_type == CHIYAA:
+                self.player.activate_speed_boost(self.balance.speed_boost_duration)
+            else:
+                self.player.activate_invincibility(self.balance.invincibility_duration)
+        if len(hits):
+            self.powerups.remove(hits)
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from mandir_jumper import World, SpawnSchedule
+from vec_env import VecEnv
+
+# VecEnv re-implements Player.update, jump buffering, spawning and scoring
+# from World. These games play the same layout and inputs through both and
+# must agree frame for frame, so the two copies can't drift apart unnoticed.
+
+@pytest.mark.parametrize("trial", range(20))
+def test_vec_env_matches_world(trial):
+    env = VecEnv(1, seed=trial)
+    world = World(0)
+    # Same layout seed as the VecEnv game
+    world.schedule = SpawnSchedule(env.schedules[0].seed, world.balance)
+    rng = random.Random(trial)
+    jump_chance = rng.choice([0.02, 0.05, 0.1, 0.3])
+    
+    for frame in range(20000):
+        jump = rng.random() < jump_chance
+        world.step(jump=jump)
+        _, _, dones, info = env.step([jump])
+        assert bool(dones[0]) == world.game_over, f"frame {frame}"
+        if world.game_over:
+            assert info["score"][0] == world.score
+            break
+        assert info["score"][0] == world.score, f"frame {frame}"
+        assert (env.x[0], env.y[0]) == pytest.approx((world.player.x, world.player.y)), f"frame {frame}"
+        assert bool(env.jumping[0]) == world.player.jumping, f"frame {frame}"
+        assert env.jump_buffer[0] == world.jump_buffer, f"frame {frame}"
+    else:
+        pytest.fail("game didn't end")
@@ -0,0 +1,269 @@
+import numpy as np
+
+from mandir_jumper import Balance, SpawnSchedule, SCREEN_WIDTH, SCREEN_HEIGHT
+from swarm import EntityStore, TYPE_NAMES, CHIYAA, PRAYER_WHEEL
+
+# Batched training environment: N independent games stepped in lockstep.
+# Player and world state are arrays with one slot per game, and all games'
+# enemies and power-ups share one EntityStore tagged by game index, so a step
+# costs a fixed number of NumPy operations however many games are running.
+# The rules mirror Player.update and World.update. Each game draws its layout
+# from its own SpawnSchedule; only games whose schedule has something due
+# this step are visited in Python.
+
+# Player constants (see Player)
+PLAYER_WIDTH = 30
+PLAYER_HEIGHT = 40
+JUMP_DURATION = 20
+JUMP_HEIGHT = 60
+CLIMB_SPEED = 2
+START_X = 80
+START_Y = SCREEN_HEIGHT - 100
+
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+# Observation layout, one row per game
+OBSERVATION_FIELDS = (
+    "player_x",          # player x
+    "player_screen_y",   # player y relative to the camera
+    "on_left_wall",      # 1 on the left wall, 0 on the right
+    "jumping",           # 1 while in the air
+    "enemy_dx",          # nearest enemy position relative to the player
+    "enemy_dy",
+    "enemy_present",     # 0 when there is no enemy (dx/dy are then 0)
+    "powerup_dx",        # nearest power-up position relative to the player
+    "powerup_dy",
+    "powerup_present",
+    "speed_boost",       # 1 while chiyaa is active
+    "invincible",        # 1 while the prayer wheel is active
+)
+
+class VecEnv:
+    def __init__(self, num_envs, seed=None, balance=None, death_penalty=0.0):
+        self.num_envs = num_envs
+        self.balance = balance if balance is not None else Balance()
+        self.death_penalty = death_penalty
+        self.random = np.random.default_rng(seed)
+        
+        n = num_envs
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.on_left_wall = np.zeros(n, dtype=bool)
+        self.jumping = np.zeros(n, dtype=bool)
+        self.jump_progress = np.zeros(n, dtype=np.int32)
+        self.jump_start_x = np.zeros(n)
+        self.jump_start_y = np.zeros(n)
+        self.jump_target_x = np.zeros(n)
+        # Frames a jump pressed mid-air stays queued for (see World.jump)
+        self.jump_buffer = np.zeros(n, dtype=np.int32)
+        # A power-up is active while its timer is above zero
+        self.speed_boost_timer = np.zeros(n, dtype=np.int32)
+        self.invincible_timer = np.zeros(n, dtype=np.int32)
+        
+        self.score = np.zeros(n, dtype=np.int64)
+        self.camera_y = np.zeros(n)
+        self.game_start_timer = np.zeros(n, dtype=np.int64)
+        # Per-game spawn schedules, and the frame at which each next needs a visit
+        self.schedules = [None] * n
+        self.wake_frame = np.zeros(n, dtype=np.int64)
+        
+        self.enemies = EntityStore(capacity=max(256, n * 8))
+        self.powerups = EntityStore(capacity=max(16, n), bobbing=True)
+        self.reset_envs(np.arange(n))
+    
+    def reset(self):
+        self.reset_envs(np.arange(self.num_envs))
+        return self.observe()
+    
+    def reset_envs(self, envs):
+        self.x[envs] = START_X
+        self.y[envs] = START_Y
+        self.on_left_wall[envs] = True
+        self.jumping[envs] = False
+        self.jump_progress[envs] = 0
+        self.jump_buffer[envs] = 0
+        self.speed_boost_timer[envs] = 0
+        self.invincible_timer[envs] = 0
+        self.score[envs] = 0
+        self.camera_y[envs] = 0
+        self.game_start_timer[envs] = 0
+        for env in envs:
+            self.schedules[env] = SpawnSchedule(int(self.random.integers(2 ** 32)), self.balance)
+        self.wake_frame[envs] = 0
+        
+        # Drop the entities that belonged to these games
+        for store in (self.enemies, self.powerups):
+            store.keep(~np.isin(store.env[:store.count], envs))
+    
+    def step(self, actions):
+        # actions: one value per game, truthy to jump this frame.
+        # Returns (observations, rewards, dones, info). Finished games are
+        # reset automatically; info["score"] holds every game's score before
+        # the reset.
+        score_before = self.score.copy()
+        
+        # Jump input; presses mid-air are buffered
+        actions = np.asarray(actions, dtype=bool)
+        self.jump_buffer[actions & self.jumping] = self.balance.jump_buffer_frames
+        self.start_jumps(actions & ~self.jumping)
+        
+        self.game_start_timer += 1
+        self.update_players()
+        
+        # Buffered jumps fire on landing
+        buffered = self.jump_buffer > 0
+        self.jump_buffer[buffered & self.jumping] -= 1
+        landed = buffered & ~self.jumping
+        self.jump_buffer[landed] = 0
+        self.start_jumps(landed)
+        
+        # Update camera
+        self.camera_y = self.y - SCREEN_HEIGHT + 200
+        
+        # Update score
+        climbing = self.game_start_timer - 60
+        self.score += (climbing > 0) & (climbing % 6 == 0)
+        
+        # Release the spawns that are due
+        self.spawn(np.flatnonzero(self.game_start_timer >= self.wake_frame))
+        
+        # Update entities and drop the ones below each game's view
+        for store in (self.enemies, self.powerups):
+            store.update()
+            store.cull(self.camera_y[store.env[:store.count]] + SCREEN_HEIGHT + 100)
+        
+        dones = self.check_collisions()
+        
+        rewards = (self.score - score_before).astype(np.float32)
+        rewards[dones] -= self.death_penalty
+        info = {"score": self.score.copy()}
+        
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.reset_envs(finished)
+        return self.observe(), rewards, dones, info
+    
+    def start_jumps(self, start):
+        self.jumping |= start
+        self.jump_progress[start] = 0
+        self.jump_start_x[start] = self.x[start]
+        self.jump_start_y[start] = self.y[start]
+        self.jump_target_x[start] = np.where(self.on_left_wall[start], SCREEN_WIDTH - 80 - PLAYER_WIDTH, 80)
+    
+    def update_players(self):
+        # Handle power-up timers
+        self.speed_boost_timer -= self.speed_boost_timer > 0
+        self.invincible_timer -= self.invincible_timer > 0
+        
+        # Automatic climbing
+        climbing = ~self.jumping
+        boost = np.where(self.speed_boost_timer > 0, 2, 1)
+        self.y[climbing] -= (CLIMB_SPEED * boost)[climbing]
+        
+        # Handle jumping animation
+        jumping = self.jumping
+        self.jump_progress += jumping
+        progress = self.jump_progress / JUMP_DURATION
+        
+        landed = jumping & (progress >= 1.0)
+        self.x[landed] = self.jump_target_x[landed]
+        self.y[landed] = self.jump_start_y[landed]
+        self.on_left_wall[landed] = ~self.on_left_wall[landed]
+        self.jump_progress[landed] = 0
+        
+        airborne = jumping & ~landed
+        p = progress[airborne]
+        self.x[airborne] = self.jump_start_x[airborne] + (self.jump_target_x[airborne] - self.jump_start_x[airborne]) * p
+        self.y[airborne] = self.jump_start_y[airborne] - JUMP_HEIGHT * 4 * p * (1 - p)
+        self.jumping = airborne
+    
+    def spawn(self, envs):
+        # Collect every due entry from these games' schedules, then add them in
+        # one batch per store
+        enemies = []
+        powerups = []
+        for env in envs:
+            schedule = self.schedules[env]
+            frame = self.game_start_timer[env]
+            schedule.advance(frame)
+            while schedule.enemies and schedule.enemies[0][0] <= frame:
+                enemies.append((env,) + schedule.enemies.popleft())
+            while schedule.powerups and schedule.powerups[0][0] <= frame:
+                powerups.append((env,) + schedule.powerups.popleft())
+            self.wake_frame[env] = schedule.wake_frame()
+        
+        if enemies:
+            env, _, x, rise, types, speed, direction, fall_speed = zip(*enemies)
+            env = np.array(env)
+            y = self.camera_y[env] - np.array(rise)
+            self.enemies.add(x=np.array(x), y=y, types=np.array([TYPE_CODES[t] for t in types]),
+                             speed=np.array(speed), direction=np.array(direction, dtype=float),
+                             fall_speed=np.array(fall_speed), env=env)
+        if powerups:
+            env, _, x, rise, types = zip(*powerups)
+            env = np.array(env)
+            y = self.camera_y[env] - np.array(rise)
+            self.powerups.add(x=np.array(x), y=y, types=np.array([TYPE_CODES[t] for t in types]), env=env)
+    
+    def player_boxes(self, store):
+        # Each live entity's own player hitbox, truncated like pygame.Rect
+        env = store.env[:store.count]
+        left = np.trunc(self.x)[env]
+        top = np.trunc(self.y)[env]
+        return left, top, left + PLAYER_WIDTH, top + PLAYER_HEIGHT
+    
+    def check_collisions(self):
+        # Enemies end the game unless the prayer wheel is active
+        dones = np.zeros(self.num_envs, dtype=bool)
+        hits = self.enemies.overlaps(*self.player_boxes(self.enemies))
+        dones[self.enemies.env[:self.enemies.count][hits]] = True
+        dones &= self.invincible_timer == 0
+        
+        # Power-ups are collected by games that are still running
+        hits = self.powerups.overlaps(*self.player_boxes(self.powerups))
+        hits &= ~dones[self.powerups.env[:self.powerups.count]]
+        collected = np.flatnonzero(hits)
+        if len(collected):
+            envs = self.powerups.env[collected]
+            types = self.powerups.type[collected]
+            self.speed_boost_timer[envs[types == CHIYAA]] = self.balance.speed_boost_duration
+            self.invincible_timer[envs[types == PRAYER_WHEEL]] = self.balance.invincibility_duration
+            self.powerups.remove(collected)
+        return dones
+    
+    def nearest(self, store):
+        # (dx, dy, present) of each game's nearest entity in store
+        dx = np.zeros(self.num_envs)
+        dy = np.zeros(self.num_envs)
+        present = np.zeros(self.num_envs, dtype=bool)
+        n = store.count
+        if n:
+            env = store.env[:n]
+            offset_x = store.x[:n] - self.x[env]
+            offset_y = store.y[:n] - self.y[env]
+            # Sort by game, then distance; the first entry per game is its nearest
+            order = np.lexsort((offset_x ** 2 + offset_y ** 2, env))
+            games, first = np.unique(env[order], return_index=True)
+            chosen = order[first]
+            dx[games] = offset_x[chosen]
+            dy[games] = offset_y[chosen]
+            present[games] = True
+        return dx, dy, present
+    
+    def observe(self):
+        enemy_dx, enemy_dy, enemy_present = self.nearest(self.enemies)
+        powerup_dx, powerup_dy, powerup_present = self.nearest(self.powerups)
+        return np.stack([
+            self.x,
+            self.y - self.camera_y,
+            self.on_left_wall,
+            self.jumping,
+            enemy_dx,
+            enemy_dy,
+            enemy_present,
+            powerup_dx,
+            powerup_dy,
+            powerup_present,
+            self.speed_boost_timer > 0,
+            self.invincible_timer > 0,
+        ], axis=1).astype(np.float32)